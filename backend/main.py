@@ -1,19 +1,48 @@
 import asyncio
 import os
+import json
+import hashlib
+import gzip
+import base64
 import logging
 from datetime import datetime, timedelta
+from email.utils import formatdate
 from pyrogram import Client, filters
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.errors import UserNotParticipant, ChatAdminRequired, ChannelPrivate
 from quart import Quart, jsonify, request, Response
+from quart.wrappers.response import DataBody
 from hypercorn.asyncio import serve
 from hypercorn.config import Config as HyperConfig
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import html
 import re
+import codecs
 import math
+import time
+import functools
+import bisect
 import aiohttp
 import urllib.parse
+import socket
+import uuid
+from array import array
+from collections import OrderedDict, Counter
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -38,31 +67,186 @@ class Config:
     WEB_SERVER_PORT = int(os.environ.get("PORT", 8000))
     BACKEND_URL = os.environ.get("BACKEND_URL", "https://sk4film.koyeb.app")
     
+    POST_SYNC_INTERVAL = int(os.environ.get("POST_SYNC_INTERVAL", "120"))
+    HOME_REFRESH_INTERVAL = int(os.environ.get("HOME_REFRESH_INTERVAL", "300"))
+    INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE", "500"))
+    INDEX_FLUSH_INTERVAL = float(os.environ.get("INDEX_FLUSH_INTERVAL", "5"))
+    INDEX_LEASE_TTL = int(os.environ.get("INDEX_LEASE_TTL", "90"))
+    LIVE_FLUSH_INTERVAL = float(os.environ.get("LIVE_FLUSH_INTERVAL", "1"))
+    POSTER_TTL = int(os.environ.get("POSTER_TTL", str(7 * 24 * 3600)))
+    POSTER_NEGATIVE_TTL = int(os.environ.get("POSTER_NEGATIVE_TTL", str(6 * 3600)))
+    POSTER_CACHE_SIZE = int(os.environ.get("POSTER_CACHE_SIZE", "2000"))
+    POSTER_CACHE_TTL = int(os.environ.get("POSTER_CACHE_TTL", "3600"))
+    POSTER_TITLE_BUDGET = float(os.environ.get("POSTER_TITLE_BUDGET", "6"))
+    BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "5"))
+    BREAKER_COOLDOWN = float(os.environ.get("BREAKER_COOLDOWN", "120"))
+    
+    HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "100"))
+    HTTP_POOL_PER_HOST = int(os.environ.get("HTTP_POOL_PER_HOST", "10"))
+    HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+    POSTER_PREFETCH_CONCURRENCY = int(os.environ.get("POSTER_PREFETCH_CONCURRENCY", "3"))
+    POSTER_PREFETCH_QUEUE = int(os.environ.get("POSTER_PREFETCH_QUEUE", "5000"))
+    POSTER_DISK_DIR = os.environ.get("POSTER_DISK_DIR", "/tmp/sk4film_posters")
+    POSTER_DISK_MB = int(os.environ.get("POSTER_DISK_MB", "512"))
+    POSTER_MAX_BYTES = 8 * 1024 * 1024
+    POSTER_VARIANT_WIDTHS = [240, 360, 480]
+    POSTER_VARIANT_WORKERS = int(os.environ.get("POSTER_VARIANT_WORKERS", "2"))
+    SEARCH_SOURCE_TIMEOUT = float(os.environ.get("SEARCH_SOURCE_TIMEOUT", "4"))
+    SEARCH_BUDGET = float(os.environ.get("SEARCH_BUDGET", "5"))
+    SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "300"))
+    SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", "500"))
+    SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL", "120"))
+    SEARCH_MISS_TTL = int(os.environ.get("SEARCH_MISS_TTL", "15"))
+    FUZZY_THRESHOLD = float(os.environ.get("FUZZY_THRESHOLD", "0.6"))
+    FUZZY_MAX_RESULTS = int(os.environ.get("FUZZY_MAX_RESULTS", "30"))
+    COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+    COMPRESS_CACHE_SIZE = int(os.environ.get("COMPRESS_CACHE_SIZE", "256"))
+    POSTER_HOSTS = [
+        'ltrbxd.com', 'media-amazon.com', 'media-imdb.com',
+        'images-amazon.com', 'justwatch.com', 'impawards.com', 'tmdb.org'
+    ]
+    # Exact hostnames only (no subdomains), e.g. Letterboxd's CloudFront distributions:
+    # anyone can create a *.cloudfront.net host, so the domain itself is never allowed
+    POSTER_EXACT_HOSTS = [h.strip().lower() for h in os.environ.get("POSTER_EXACT_HOSTS", "").split(",") if h.strip()]
+    POSTER_IMAGE_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'image/gif', 'image/avif')
+    POSTER_MAX_REDIRECTS = 3
+    
     OMDB_KEYS = ["8265bd1c", "b9bd48a6", "3e7e1e9d"]
     TMDB_KEYS = ["e547e17d4e91f3e62a571655cd1ccaff", "8265bd1f"]
+    OMDB_DAILY_LIMIT = int(os.environ.get("OMDB_DAILY_LIMIT", "1000"))
+    TMDB_RATE = float(os.environ.get("TMDB_RATE", "4"))
+    API_KEY_COOLDOWN = int(os.environ.get("API_KEY_COOLDOWN", "900"))
 
 app = Quart(__name__)
 
+ROUTE_CACHE_CONTROL = {
+    '/': 'no-cache',
+    '/health': 'no-store',
+    '/api/index_status': 'no-cache',
+    '/api/movies': 'public, max-age=30, s-maxage=60, stale-while-revalidate=300',
+    # Shorter than SEARCH_CACHE_TTL so cache invalidation reaches clients; the ETag makes revalidation cheap
+    '/api/search': f'public, max-age=0, s-maxage={min(30, Config.SEARCH_CACHE_TTL)}',
+    '/api/post': 'public, max-age=300, s-maxage=3600'
+}
+COMPRESSIBLE_TYPES = ('application/json', 'image/svg+xml', 'text/')
+
+def negotiate_encoding(accept):
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    offered = {}
+    for part in (accept or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    if brotli and offered.get('br', 0) > 0:
+        return 'br'
+    if offered.get('gzip', 0) > 0 or offered.get('*', 0) > 0:
+        return 'gzip'
+    return None
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
 @app.after_request
 async def add_headers(response):
     response.headers['Access-Control-Allow-Origin'] = '*'
     response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
     response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    
+    if request.method not in ('GET', 'HEAD'):
+        return response
+    if response.status_code >= 400:
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    if 'Cache-Control' not in response.headers and request.path in ROUTE_CACHE_CONTROL:
+        response.headers['Cache-Control'] = ROUTE_CACHE_CONTROL[request.path]
+    if response.status_code != 200 or not isinstance(response.response, DataBody):
+        return response  # 304s and streamed bodies (poster blobs) pass through
+    
+    data = await response.get_data()
+    etag = response.headers.get('ETag')
+    if not etag:
+        etag = f'W/"{hashlib.sha1(data).hexdigest()[:16]}"'
+        response.headers['ETag'] = etag
+        if not_modified(etag, None):
+            response.status_code = 304
+            response.set_data(b'')
+            return response
+    
+    if not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES) or 'Content-Encoding' in response.headers:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if not encoding or len(data) < Config.COMPRESS_MIN_BYTES:
+        return response
+    
+    # Same payload hash + encoding -> same bytes; repeated hits skip the compressor
+    ck = (etag, encoding)
+    cached = compressed_bodies.get(ck)
+    if cached:
+        body = cached[0]
+    else:
+        body = compress_body(data, encoding)
+        compressed_bodies.set(ck, body)
+    if not etag.startswith('W/'):
+        response.headers['ETag'] = f'W/{etag}'
+    response.headers['Content-Encoding'] = encoding
+    response.set_data(body)
     return response
 
+http_session = None
+
+def get_http_session():
+    """Application-wide HTTP client: pooled keep-alive connections, DNS cache, default timeouts"""
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=Config.HTTP_POOL_SIZE,
+            limit_per_host=Config.HTTP_POOL_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+        http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=Config.HTTP_TIMEOUT, connect=4, sock_read=Config.HTTP_TIMEOUT),
+            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+        )
+    return http_session
+
+async def close_http_session():
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+        # Give SSL transports a moment to close cleanly
+        await asyncio.sleep(0.25)
+    http_session = None
+
 mongo_client = None
 db = None
 files_col = None
+posts_col = None
+sync_col = None
+posters_col = None
 
 async def init_mongodb():
-    global mongo_client, db, files_col
+    global mongo_client, db, files_col, posts_col, sync_col, posters_col
     try:
-        logger.info("🔌 MongoDB (Files Only)...")
+        logger.info("🔌 MongoDB (Files + Posts)...")
         mongo_client = AsyncIOMotorClient(Config.MONGODB_URI, serverSelectionTimeoutMS=10000)
         await mongo_client.admin.command('ping')
         
         db = mongo_client.sk4film
         files_col = db.files
+        posts_col = db.posts
+        sync_col = db.sync_state
+        posters_col = db.posters
         
         try:
             await files_col.create_index([("title", "text")])
@@ -94,17 +278,135 @@ async def init_mongodb():
         except:
             pass
         
+        try:
+            await posts_col.create_index(
+                [("channel_id", 1), ("message_id", -1)],
+                unique=True,
+                name="post_ch_msg_unique_idx"
+            )
+        except:
+            pass
+        
+        try:
+            await posts_col.create_index([("normalized_title", 1)])
+        except:
+            pass
+        
+        try:
+            await posters_col.create_index([("expires_at", 1)], expireAfterSeconds=0)
+        except:
+            pass
+        
         logger.info("✅ MongoDB OK")
         return True
     except Exception as e:
         logger.error(f"❌ MongoDB: {e}")
         return False
 
+class LRUCache:
+    """Bounded LRU map whose entries expire on the monotonic clock"""
+    
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+    
+    def get(self, key):
+        """Return (value, is_fresh), or None when the key is absent"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        self._data.move_to_end(key)
+        value, expires = item
+        return value, time.monotonic() < expires
+    
+    def set(self, key, value, ttl=None):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def pop(self, key):
+        return self._data.pop(key, None)
+    
+    def keys(self):
+        return list(self._data)
+    
+    def __contains__(self, key):
+        return key in self._data
+    
+    def __len__(self):
+        return len(self._data)
+
+class ApiKeyPool:
+    """Round-robin API keys, each with a token bucket and a cooldown after 401/429"""
+    
+    def __init__(self, name, keys, rate, burst, cooldown):
+        now = time.monotonic()
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.cooldown = cooldown
+        self.keys = [
+            {'key': k, 'tokens': float(burst), 'updated': now, 'cooldown_until': 0.0, 'requests': 0, 'rejected': 0}
+            for k in keys
+        ]
+        self._next = 0
+    
+    def _refill(self, k, now):
+        k['tokens'] = min(self.burst, k['tokens'] + (now - k['updated']) * self.rate)
+        k['updated'] = now
+    
+    def acquire(self):
+        """Next key with quota left, or None when every key is exhausted or cooling down"""
+        now = time.monotonic()
+        for i in range(len(self.keys)):
+            idx = (self._next + i) % len(self.keys)
+            k = self.keys[idx]
+            if k['cooldown_until'] > now:
+                continue
+            self._refill(k, now)
+            if k['tokens'] >= 1:
+                k['tokens'] -= 1
+                k['requests'] += 1
+                self._next = idx + 1
+                return k['key']
+        return None
+    
+    def report(self, key, status):
+        if status not in (401, 429):
+            return
+        for k in self.keys:
+            if k['key'] == key:
+                k['rejected'] += 1
+                k['tokens'] = 0.0
+                k['cooldown_until'] = time.monotonic() + self.cooldown
+                logger.warning(f"    🔑 {self.name} key {key[:4]}… rejected ({status}), cooling down {self.cooldown}s")
+    
+    def status(self):
+        now = time.monotonic()
+        result = []
+        for k in self.keys:
+            self._refill(k, now)
+            result.append({
+                'key': f"{k['key'][:4]}…",
+                'remaining': int(k['tokens']),
+                'cooldown_seconds': max(0, int(k['cooldown_until'] - now)),
+                'requests': k['requests'],
+                'rejected': k['rejected']
+            })
+        return result
+
+omdb_keys = ApiKeyPool('OMDB', Config.OMDB_KEYS, rate=Config.OMDB_DAILY_LIMIT / 86400, burst=50, cooldown=Config.API_KEY_COOLDOWN)
+tmdb_keys = ApiKeyPool('TMDB', Config.TMDB_KEYS, rate=Config.TMDB_RATE, burst=40, cooldown=Config.API_KEY_COOLDOWN)
+
 User = None
 bot = None
 bot_started = False
+live_ingest = {'received': 0, 'written': 0, 'errors': 0, 'error': None}
 movie_db = {
-    'poster_cache': {},
+    'poster_cache': LRUCache(Config.POSTER_CACHE_SIZE, Config.POSTER_CACHE_TTL),
+    'inflight': {},
     'stats': {
         'letterboxd': 0,
         'imdb': 0,
@@ -113,10 +415,43 @@ movie_db = {
         'omdb': 0,
         'tmdb': 0,
         'custom': 0,
-        'cache_hits': 0
+        'cache_hits': 0,
+        'coalesced': 0
     }
 }
 
+post_index = {
+    'entries': {},
+    'postings': {},
+    'tokens': [],
+    'last_ids': {},
+    'ready': False,
+    'built_at': None,
+    'wake': None
+}
+title_grams = {
+    'ids': {},
+    'titles': [],
+    'sizes': array('H'),
+    'postings': {},
+    'posts': {},
+    'files_ready': False
+}
+compressed_bodies = LRUCache(Config.COMPRESS_CACHE_SIZE, 3600)
+search_cache = LRUCache(Config.SEARCH_CACHE_SIZE, Config.SEARCH_CACHE_TTL)
+search_terms = {'postings': {}, 'terms': [], 'inflight': {}, 'stats': {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidated': 0}}
+home_feed = {
+    'body': None,
+    'etag': None,
+    'last_modified': None,
+    'built_at': None,
+    'total': 0,
+    'refreshes': 0,
+    'errors': 0,
+    'ready': None,
+    'stale': None
+}
+
 def normalize_title(title):
     if not title:
         return ""
@@ -234,6 +569,363 @@ def is_new(date):
     except:
         return False
 
+def tokenize(text):
+    if not text:
+        return []
+    return [t for t in re.split(r'\W+', text.lower()) if t]
+
+def post_tokens(post):
+    return set(tokenize(post['title'])) | set(tokenize(post['normalized_title']))
+
+def unindex_post(key):
+    post = post_index['entries'].pop(key, None)
+    if not post:
+        return
+    title_grams['posts'].get(post['normalized_title'], set()).discard(key)
+    for token in post_tokens(post):
+        keys = post_index['postings'].get(token)
+        if keys is None:
+            continue
+        keys.discard(key)
+        if not keys:
+            del post_index['postings'][token]
+            i = bisect.bisect_left(post_index['tokens'], token)
+            if i < len(post_index['tokens']) and post_index['tokens'][i] == token:
+                del post_index['tokens'][i]
+
+def index_post(post):
+    """Add a parsed post to the in-memory post index"""
+    key = (post['channel_id'], post['message_id'])
+    unindex_post(key)
+    post_index['entries'][key] = post
+    
+    for token in post_tokens(post):
+        keys = post_index['postings'].get(token)
+        if keys is None:
+            keys = post_index['postings'][token] = set()
+            bisect.insort(post_index['tokens'], token)
+        keys.add(key)
+    add_title_grams(post['normalized_title'], key)
+    # last_ids is the sync high-water mark and only sync_posts/the watermark move it:
+    # an edit indexed here for a newer message must not make the sync skip the gap
+    return post
+
+def parse_post(channel_id, msg):
+    """Build a post document from a text channel message"""
+    if not msg.text or len(msg.text) <= 15:
+        return None
+    title = extract_title_smart(msg.text)
+    if not title:
+        return None
+    return {
+        'channel_id': channel_id,
+        'message_id': msg.id,
+        'title': title,
+        'normalized_title': normalize_title(title),
+        'content': format_post(msg.text),
+        'date': msg.date,
+        'views': getattr(msg, 'views', 0) or 0
+    }
+
+def search_post_index(query):
+    """Answer a title query from the post index, newest posts first per channel"""
+    query_lower = query.lower()
+    q_tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+    if not q_tokens:
+        return []
+    
+    candidates = None
+    tokens = post_index['tokens']
+    for qt in q_tokens:
+        keys = set()
+        i = bisect.bisect_left(tokens, qt)
+        while i < len(tokens) and tokens[i].startswith(qt):
+            keys |= post_index['postings'][tokens[i]]
+            i += 1
+        candidates = keys if candidates is None else candidates & keys
+        if not candidates:
+            return []
+    
+    order = {cid: i for i, cid in enumerate(Config.TEXT_CHANNEL_IDS)}
+    results = [post_index['entries'][k] for k in candidates if query_lower in post_index['entries'][k]['title'].lower()]
+    results.sort(key=lambda p: (order.get(p['channel_id'], len(order)), -p['message_id']))
+    return results
+
+def padded_trigrams(text):
+    padded = f"$${text}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def query_trigrams(query):
+    """Trigrams of a query with spaces and punctuation removed ("spider man" == "spiderman")"""
+    compact = re.sub(r'[^a-z0-9]', '', (query or '').lower())
+    return padded_trigrams(compact) if compact else set()
+
+def title_trigrams(norm_title):
+    """Trigrams of the compact title plus each of its words, so a query can match a word-aligned part"""
+    words = re.findall(r'[a-z0-9]+', (norm_title or '').lower())
+    if not words:
+        return set()
+    grams = padded_trigrams(''.join(words))
+    for word in words:
+        grams |= padded_trigrams(word)
+    return grams
+
+def add_title_grams(norm_title, post_key=None):
+    """Add a normalized title (and optionally a post carrying it) to the trigram index"""
+    if not norm_title:
+        return
+    if post_key is not None:
+        title_grams['posts'].setdefault(norm_title, set()).add(post_key)
+    if norm_title in title_grams['ids']:
+        return
+    grams = title_trigrams(norm_title)
+    if not grams:
+        return
+    # Ids only grow, so every posting array stays sorted and can be bisected
+    tid = len(title_grams['titles'])
+    title_grams['ids'][norm_title] = tid
+    title_grams['titles'].append(norm_title)
+    title_grams['sizes'].append(min(len(grams), 65535))
+    for gram in grams:
+        posting = title_grams['postings'].get(gram)
+        if posting is None:
+            posting = title_grams['postings'][gram] = array('I')
+        posting.append(tid)
+
+def fuzzy_title_search(query, limit=None, threshold=None):
+    """Titles containing most of the query's trigrams, best first"""
+    # Containment (shared / |Q|) rather than Dice, so a partial title with a typo still
+    # matches ("avngers" -> "avengers endgame"); Dice only breaks ties towards closer lengths
+    threshold = threshold or Config.FUZZY_THRESHOLD
+    q_grams = query_trigrams(normalize_title(query) or query)
+    if len(q_grams) < 3:
+        return []
+    
+    postings = title_grams['postings']
+    lists = sorted((postings.get(g, array('I')) for g in q_grams), key=len)
+    # containment >= t needs at least t*|Q| shared grams, so every match must
+    # appear in one of the |Q| - min_shared + 1 rarest query grams
+    min_shared = max(1, math.ceil(threshold * len(q_grams) - 1e-9))
+    split = len(lists) - min_shared + 1
+    shared = Counter()
+    for posting in lists[:split]:
+        shared.update(posting)
+    
+    for posting in lists[split:]:
+        for tid in shared:
+            i = bisect.bisect_left(posting, tid)
+            if i < len(posting) and posting[i] == tid:
+                shared[tid] += 1
+    
+    sizes = title_grams['sizes']
+    matches = []
+    for tid, count in shared.items():
+        if count >= min_shared:
+            dice = 2 * count / (len(q_grams) + sizes[tid])
+            matches.append((title_grams['titles'][tid], count / len(q_grams), dice))
+    matches.sort(key=lambda m: (m[1], m[2]), reverse=True)
+    return [(title, score) for title, score, _ in matches[:limit or Config.FUZZY_MAX_RESULTS]]
+
+async def load_file_title_grams():
+    """Add the distinct normalized titles of all indexed files to the trigram index"""
+    if files_col is None:
+        return 0
+    before = len(title_grams['titles'])
+    try:
+        async for doc in files_col.aggregate([{'$group': {'_id': '$normalized_title'}}], allowDiskUse=True):
+            add_title_grams(doc['_id'])
+        title_grams['files_ready'] = True
+        logger.info(f"🔤 Trigram index: {len(title_grams['titles'])} titles, {len(title_grams['postings'])} grams")
+    except Exception as e:
+        logger.error(f"❌ Trigram index load error: {e}")
+    return len(title_grams['titles']) - before
+
+async def get_watermark(name):
+    if sync_col is None:
+        return 0
+    doc = await sync_col.find_one({'_id': name})
+    return doc.get('last_message_id', 0) if doc else 0
+
+async def set_watermark(name, message_id):
+    if sync_col is None:
+        return
+    await sync_col.update_one(
+        {'_id': name},
+        {'$set': {'last_message_id': message_id, 'updated_at': datetime.now()}},
+        upsert=True
+    )
+
+async def sync_posts(channel_id):
+    """Pull messages newer than the channel watermark into posts and the index"""
+    last_id = max(post_index['last_ids'].get(channel_id, 0), await get_watermark(f"posts:{channel_id}"))
+    top_id = last_id
+    new_posts = []
+    
+    async for msg in User.get_chat_history(channel_id):
+        if msg.id <= last_id:
+            break
+        top_id = max(top_id, msg.id)
+        post = parse_post(channel_id, msg)
+        if post:
+            new_posts.append(post)
+    
+    if new_posts and posts_col is not None:
+        now = datetime.now()
+        await posts_col.bulk_write([
+            UpdateOne(
+                {'channel_id': p['channel_id'], 'message_id': p['message_id']},
+                {'$set': {**p, 'synced_at': now}},
+                upsert=True
+            ) for p in new_posts
+        ], ordered=False)
+    
+    for post in new_posts:
+        index_post(post)
+        enqueue_poster_prefetch(post['title'], PREFETCH_POST)
+    invalidate_search_cache([post['title'] for post in new_posts])
+    
+    if top_id > last_id:
+        post_index['last_ids'][channel_id] = top_id
+        await set_watermark(f"posts:{channel_id}", top_id)
+    if new_posts and channel_id == Config.MAIN_CHANNEL_ID and home_feed['stale']:
+        home_feed['stale'].set()
+    return len(new_posts)
+
+async def refresh_post(channel_id, msg):
+    """Apply an edited channel post to the posts collection and the index"""
+    post = parse_post(channel_id, msg)
+    key = (channel_id, msg.id)
+    old = post_index['entries'].get(key)
+    if post is None:
+        await remove_post(channel_id, msg.id)
+        return
+    if posts_col is not None:
+        await posts_col.update_one(
+            {'channel_id': channel_id, 'message_id': msg.id},
+            {'$set': {**post, 'synced_at': datetime.now()}},
+            upsert=True
+        )
+    index_post(post)
+    invalidate_search_cache([post['title']] + ([old['title']] if old else []))
+    if channel_id == Config.MAIN_CHANNEL_ID and home_feed['stale']:
+        home_feed['stale'].set()
+
+async def remove_post(channel_id, message_id):
+    """Drop a deleted (or no longer parseable) channel post from storage and the index"""
+    old = post_index['entries'].get((channel_id, message_id))
+    unindex_post((channel_id, message_id))
+    if posts_col is not None:
+        await posts_col.delete_one({'channel_id': channel_id, 'message_id': message_id})
+    if old:
+        invalidate_search_cache([old['title']])
+        if channel_id == Config.MAIN_CHANNEL_ID and home_feed['stale']:
+            home_feed['stale'].set()
+
+async def load_post_index():
+    """Fill the post index from the posts collection"""
+    if posts_col is None:
+        return 0
+    count = 0
+    projection = {'_id': 0, 'synced_at': 0}
+    async for doc in posts_col.find({'channel_id': {'$in': Config.TEXT_CHANNEL_IDS}}, projection):
+        index_post(doc)
+        count += 1
+    for channel_id in Config.TEXT_CHANNEL_IDS:
+        wm = await get_watermark(f"posts:{channel_id}")
+        if wm > post_index['last_ids'].get(channel_id, 0):
+            post_index['last_ids'][channel_id] = wm
+    return count
+
+async def posts_sync_worker():
+    """Load stored posts, then keep posts and the index current by watermark"""
+    if not User:
+        logger.warning("⚠️ Cannot sync posts")
+        return
+    
+    post_index['wake'] = asyncio.Event()
+    try:
+        loaded = await load_post_index()
+        logger.info(f"🗂️ Loaded {loaded} stored posts")
+    except Exception as e:
+        logger.error(f"❌ Post load error: {e}")
+    
+    while True:
+        for channel_id in Config.TEXT_CHANNEL_IDS:
+            try:
+                count = await sync_posts(channel_id)
+                if count:
+                    logger.info(f"🗂️ Synced +{count} posts from {channel_name(channel_id)}")
+            except Exception as e:
+                logger.error(f"❌ Post sync {channel_name(channel_id)}: {e}")
+        
+        for title in home_feed_titles():
+            enqueue_poster_prefetch(title, PREFETCH_HOME)
+        
+        if not post_index['ready']:
+            post_index['ready'] = True
+            post_index['built_at'] = datetime.now()
+            logger.info(f"✅ Post index ready: {len(post_index['entries'])} posts, {len(post_index['postings'])} tokens")
+            if home_feed['stale']:
+                home_feed['stale'].set()
+        
+        # Sleep until the next interval or until a new channel post wakes us up
+        try:
+            await asyncio.wait_for(post_index['wake'].wait(), Config.POST_SYNC_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        post_index['wake'].clear()
+
+async def refresh_home_feed():
+    """Rebuild the home feed and keep it as pre-serialized JSON with an ETag"""
+    movies = await get_home_movies_live()
+    digest = hashlib.sha1(json.dumps(movies, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    etag = f'"{digest}"'
+    home_feed['refreshes'] += 1
+    if etag == home_feed['etag']:
+        return False
+    
+    now = datetime.now()
+    home_feed['body'] = json.dumps({
+        'status': 'success',
+        'movies': movies,
+        'total': len(movies),
+        'bot_username': Config.BOT_USERNAME,
+        'mode': 'SNAPSHOT',
+        'generated_at': now.isoformat(),
+        'poster_guarantee': '100% WORKING',
+        'poster_sources': 'Letterboxd → IMDb → JustWatch → IMPAwards → OMDB+TMDB',
+        'poster_stats': movie_db['stats']
+    }, default=str).encode()
+    home_feed['etag'] = etag
+    home_feed['last_modified'] = formatdate(time.time(), usegmt=True)
+    home_feed['built_at'] = now
+    home_feed['total'] = len(movies)
+    return True
+
+async def home_feed_worker():
+    """Refresh the home feed snapshot on an interval and whenever new main-channel posts arrive"""
+    while True:
+        try:
+            if await refresh_home_feed():
+                logger.info(f"🏠 Home feed snapshot rebuilt: {home_feed['total']} movies")
+        except Exception as e:
+            home_feed['errors'] += 1
+            logger.error(f"❌ Home feed refresh: {e}")
+        if home_feed['body'] is not None:
+            home_feed['ready'].set()
+        
+        try:
+            await asyncio.wait_for(home_feed['stale'].wait(), Config.HOME_REFRESH_INTERVAL)
+            await asyncio.sleep(2)  # let a burst of posts settle into one rebuild
+        except asyncio.TimeoutError:
+            pass
+        home_feed['stale'].clear()
+
+def start_home_feed():
+    home_feed['ready'] = asyncio.Event()
+    home_feed['stale'] = asyncio.Event()
+    asyncio.create_task(home_feed_worker())
+
 async def check_force_sub_immediate(user_id, max_retries=5):
     """IMMEDIATE force subscription check with instant verification"""
     for attempt in range(max_retries):
@@ -265,73 +957,457 @@ async def check_force_sub_immediate(user_id, max_retries=5):
     
     return False, "max_retries_exceeded"
 
-async def index_files_background():
-    """Background file indexing - non-blocking"""
+def build_file_doc(msg):
+    """Build a files document from a file channel message"""
+    if not (msg.document or msg.video):
+        return None
+    title = extract_title_from_file(msg)
+    if not title:
+        return None
+    file_id = msg.document.file_id if msg.document else msg.video.file_id
+    file_size = msg.document.file_size if msg.document else (msg.video.file_size if msg.video else 0)
+    file_name = msg.document.file_name if msg.document else (msg.video.file_name if msg.video else 'video.mp4')
+    return {
+        'channel_id': Config.FILE_CHANNEL_ID,
+        'message_id': msg.id,
+        'title': title,
+        'normalized_title': normalize_title(title),
+        'file_id': file_id,
+        'quality': detect_quality(file_name),
+        'file_size': file_size,
+        'file_name': file_name,
+        'caption': msg.caption or '',
+        'date': msg.date,
+        'indexed_at': datetime.now()
+    }
+
+async def get_index_state(name):
+    if sync_col is None:
+        return {}
+    return await sync_col.find_one({'_id': name}) or {}
+
+async def save_index_state(name, **fields):
+    if sync_col is None:
+        return
+    fields['updated_at'] = datetime.now()
+    await sync_col.update_one({'_id': name}, {'$set': fields}, upsert=True)
+
+async def bulk_upsert_files(batch):
+    """Unordered bulk upsert of file docs; returns (written, write_errors)"""
+    ops = [
+        UpdateOne(
+            {'channel_id': doc['channel_id'], 'message_id': doc['message_id']},
+            {'$set': doc},
+            upsert=True
+        ) for doc in batch
+    ]
+    try:
+        await files_col.bulk_write(ops, ordered=False)
+        return len(batch), []
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        for err in errors:
+            doc = batch[err['index']]
+            logger.warning(f"    ⚠️ File {doc['message_id']} not written: {err.get('errmsg')}")
+        return len(batch) - len(errors), errors
+
+async def record_failed_files(docs):
+    """Remember files whose write failed so the next indexing run retries them"""
+    if sync_col is None:
+        return
+    by_channel = {}
+    for doc in docs:
+        by_channel.setdefault(doc['channel_id'], []).append(doc['message_id'])
+    for channel_id, ids in by_channel.items():
+        await sync_col.update_one(
+            {'_id': f"files:{channel_id}"},
+            {'$addToSet': {'failed_ids': {'$each': ids}}, '$set': {'updated_at': datetime.now()}},
+            upsert=True
+        )
+
+async def retry_failed_files(channel_id, name):
+    """Re-fetch and re-write files recorded as failed; returns how many landed"""
+    state = await get_index_state(name)
+    failed_ids = state.get('failed_ids') or []
+    if not failed_ids:
+        return 0
+    logger.info(f"📁 Retrying {len(failed_ids)} files that failed to write...")
+    written_total = 0
+    for i in range(0, len(failed_ids), 200):
+        ids = failed_ids[i:i + 200]
+        msgs = await User.get_messages(channel_id, ids)
+        docs = [doc for doc in (build_file_doc(m) for m in msgs if m and not m.empty) if doc]
+        still_failed = set()
+        if docs:
+            written, errors = await bulk_upsert_files(docs)
+            written_total += written
+            still_failed = {docs[err['index']]['message_id'] for err in errors}
+            stored = [doc for doc in docs if doc['message_id'] not in still_failed]
+            invalidate_search_cache([doc['title'] for doc in stored])
+            for doc in stored:
+                add_title_grams(doc['normalized_title'])
+        # Deleted messages and non-file messages are dropped from the retry list too
+        done = [mid for mid in ids if mid not in still_failed]
+        await sync_col.update_one({'_id': name}, {'$pull': {'failed_ids': {'$in': done}}})
+    return written_total
+
+async def file_write_worker(queue, stats, batch_size=None, flush_interval=None, on_flush=None, stop_on_error=True):
+    """Drain file docs from a queue into bulk writes, flushing by size or age"""
+    batch_size = batch_size or Config.INDEX_BATCH_SIZE
+    flush_interval = flush_interval or Config.INDEX_FLUSH_INTERVAL
+    loop = asyncio.get_running_loop()
+    batch = []
+    deadline = 0
+    done = False
+    
+    while not done:
+        try:
+            timeout = max(0, deadline - loop.time()) if batch else None
+            doc = await asyncio.wait_for(queue.get(), timeout)
+            if doc is None:
+                done = True
+            else:
+                if not batch:
+                    deadline = loop.time() + flush_interval
+                batch.append(doc)
+        except asyncio.TimeoutError:
+            pass
+        
+        if batch and (done or len(batch) >= batch_size or loop.time() >= deadline):
+            # After a hard failure keep draining so producers never block,
+            # but stop writing and checkpointing
+            if stats.get('error') is None:
+                try:
+                    written, errors = await bulk_upsert_files(batch)
+                    stats['written'] += written
+                    stats['errors'] += len(errors)
+                    failed = {err['index'] for err in errors}
+                    if failed:
+                        await record_failed_files([batch[i] for i in failed])
+                    # Only documents that actually landed count as indexed
+                    stored = [doc for i, doc in enumerate(batch) if i not in failed]
+                    invalidate_search_cache([doc['title'] for doc in stored])
+                    for doc in stored:
+                        add_title_grams(doc['normalized_title'])
+                    if on_flush and stored:
+                        await on_flush(stored)
+                except Exception as e:
+                    logger.error(f"❌ Bulk write error: {e}")
+                    if stop_on_error:
+                        stats['error'] = e
+                    else:
+                        stats['errors'] += len(batch)
+                        try:
+                            await record_failed_files(batch)
+                        except Exception as err:
+                            logger.error(f"❌ Could not record failed files: {err}")
+            batch = []
+    
+    return stats
+
+async def index_file_range(channel_id, offset_id, stop_at, checkpoint=None, job=None):
+    """Index files older than offset_id (0 = newest) down to stop_at (exclusive)"""
+    queue = asyncio.Queue(maxsize=Config.INDEX_BATCH_SIZE * 4)
+    stats = {'written': 0, 'errors': 0, 'error': None}
+    
+    async def on_flush(batch):
+        if checkpoint:
+            await save_index_state(checkpoint, pending_cursor=batch[-1]['message_id'])
+        if job:
+            job['written'] += len(batch)
+            job['errors'] = stats['errors']
+        logger.info(f"    ✅ Indexed {stats['written']} files ({stats['errors']} errors)...")
+    
+    writer = asyncio.create_task(file_write_worker(queue, stats, on_flush=on_flush))
+    count = 0
+    try:
+        async for msg in User.get_chat_history(channel_id, offset_id=offset_id):
+            if offset_id and msg.id >= offset_id:
+                continue
+            if msg.id <= stop_at:
+                break
+            if stats['error'] is not None:
+                break
+            if job:
+                job['current_id'] = msg.id
+            doc = build_file_doc(msg)
+            if doc:
+                await queue.put(doc)
+                count += 1
+                if job:
+                    job['processed'] += 1
+    finally:
+        await queue.put(None)
+        await writer
+    
+    if stats['error'] is not None:
+        raise stats['error']
+    return count
+
+async def index_files_background(full=False, job=None):
+    """Background file indexing from the last checkpoint - non-blocking"""
+    # Checkpoint: everything <= last_message_id is indexed; while a run is in
+    # progress, everything in [pending_cursor, pending_top] is indexed too.
+    # Ids in failed_ids are the exception and get retried at the start of each run.
     if not User or files_col is None:
         logger.warning("⚠️ Cannot index in background")
         return
     
-    logger.info("📁 Starting background file indexing...")
+    channel_id = Config.FILE_CHANNEL_ID
+    name = f"files:{channel_id}"
     
     try:
-        count = 0
-        batch = []
-        batch_size = 50
-        
-        async for msg in User.get_chat_history(Config.FILE_CHANNEL_ID):
-            if msg.document or msg.video:
-                title = extract_title_from_file(msg)
-                if title:
-                    file_id = msg.document.file_id if msg.document else msg.video.file_id
-                    file_size = msg.document.file_size if msg.document else (msg.video.file_size if msg.video else 0)
-                    file_name = msg.document.file_name if msg.document else (msg.video.file_name if msg.video else 'video.mp4')
-                    quality = detect_quality(file_name)
-                    
-                    batch.append({
-                        'channel_id': Config.FILE_CHANNEL_ID,
-                        'message_id': msg.id,
-                        'title': title,
-                        'normalized_title': normalize_title(title),
-                        'file_id': file_id,
-                        'quality': quality,
-                        'file_size': file_size,
-                        'file_name': file_name,
-                        'caption': msg.caption or '',
-                        'date': msg.date,
-                        'indexed_at': datetime.now()
-                    })
-                    
-                    count += 1
-                    
-                    if len(batch) >= batch_size:
-                        try:
-                            for doc in batch:
-                                await files_col.update_one(
-                                    {'channel_id': doc['channel_id'], 'message_id': doc['message_id']},
-                                    {'$set': doc},
-                                    upsert=True
-                                )
-                            logger.info(f"    ✅ Indexed {count} files...")
-                            batch = []
-                        except Exception as e:
-                            logger.error(f"Batch error: {e}")
-                            batch = []
-        
-        if batch:
+        if full:
+            logger.info("📁 Full rebuild requested, clearing checkpoint")
+            await save_index_state(name, last_message_id=0, pending_top=None, pending_cursor=None, failed_ids=[])
+        else:
             try:
-                for doc in batch:
-                    await files_col.update_one(
-                        {'channel_id': doc['channel_id'], 'message_id': doc['message_id']},
-                        {'$set': doc},
-                        upsert=True
-                    )
+                retried = await retry_failed_files(channel_id, name)
+                if retried:
+                    logger.info(f"✅ Re-indexed {retried} previously failed files")
             except Exception as e:
-                logger.error(f"Final batch error: {e}")
+                logger.error(f"❌ Failed-file retry error: {e}")
+        
+        state = await get_index_state(name)
+        last_id = state.get('last_message_id', 0)
+        top = state.get('pending_top')
+        cursor = state.get('pending_cursor')
+        
+        newest = 0
+        async for msg in User.get_chat_history(channel_id, limit=1):
+            newest = msg.id
+        
+        count = 0
+        if top:
+            logger.info(f"📁 Resuming interrupted indexing at message {cursor} (checkpoint {last_id})")
+            if newest > top:
+                count += await index_file_range(channel_id, 0, top, job=job)
+            top = max(top, newest)
+        else:
+            if newest <= last_id:
+                logger.info(f"✅ Files up to date (checkpoint {last_id})")
+                return
+            logger.info(f"📁 Indexing files {last_id + 1}..{newest}...")
+            top, cursor = newest, newest + 1
+        
+        await save_index_state(name, pending_top=top, pending_cursor=cursor)
+        if job:
+            job.update(top=top, stop_at=last_id, resume_from=min(cursor, top), current_id=min(cursor, top))
+        count += await index_file_range(channel_id, cursor, last_id, checkpoint=name, job=job)
+        await save_index_state(name, last_message_id=top, pending_top=None, pending_cursor=None)
         
-        logger.info(f"✅ Background indexing complete: {count} files")
+        logger.info(f"✅ Background indexing complete: {count} files (checkpoint {top})")
         
     except Exception as e:
         logger.error(f"❌ Background indexing error: {e}")
+        if job:
+            job['error'] = str(e)
+
+index_jobs = {}
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+async def acquire_index_lease(name):
+    """Take or renew the cross-replica lease for an index job; returns the holder doc if another replica has it"""
+    if sync_col is None:
+        return None
+    now = datetime.now()
+    try:
+        await sync_col.update_one(
+            {'_id': f"lease:{name}", '$or': [{'owner': INSTANCE_ID}, {'expires_at': {'$lt': now}}]},
+            {'$set': {'owner': INSTANCE_ID, 'expires_at': now + timedelta(seconds=Config.INDEX_LEASE_TTL), 'renewed_at': now}},
+            upsert=True
+        )
+        return None
+    except DuplicateKeyError:
+        # The filter missed because a live lease belongs to someone else
+        return await sync_col.find_one({'_id': f"lease:{name}"}) or {'owner': 'unknown'}
+
+async def release_index_lease(name):
+    if sync_col is None:
+        return
+    try:
+        await sync_col.delete_one({'_id': f"lease:{name}", 'owner': INSTANCE_ID})
+    except Exception as e:
+        logger.warning(f"⚠️ Index lease release failed: {e}")
+
+async def renew_index_lease(job):
+    """Keep the lease alive while the job runs; stop the job if another replica took it over"""
+    while True:
+        await asyncio.sleep(Config.INDEX_LEASE_TTL / 3)
+        try:
+            holder = await acquire_index_lease(job['lease'])
+        except Exception as e:
+            logger.warning(f"⚠️ Index lease renewal failed: {e}")
+            continue
+        if holder:
+            logger.warning(f"⚠️ Index lease lost to {holder.get('owner')}, stopping this job")
+            job['task'].cancel()
+            return
+
+async def run_index_job(job):
+    renewer = asyncio.create_task(renew_index_lease(job))
+    try:
+        await index_files_background(full=job['full'], job=job)
+        job['status'] = 'failed' if job['error'] else 'completed'
+    except asyncio.CancelledError:
+        job['status'] = 'cancelled'
+        logger.info(f"⏹️ Indexing cancelled after {job['processed']} files (checkpoint saved)")
+    finally:
+        renewer.cancel()
+        await asyncio.shield(release_index_lease(job['lease']))
+        job['finished_at'] = datetime.now()
+        job['elapsed'] = asyncio.get_running_loop().time() - job['started_mono']
+
+async def start_index_job(channel_id=None, full=False):
+    """Start an indexing job unless one is already running for the channel on any replica"""
+    channel_id = channel_id or Config.FILE_CHANNEL_ID
+    job = index_jobs.get(channel_id)
+    if job and job['status'] == 'running':
+        return job, False
+    
+    # index_jobs only guards this process; the lease in sync_col guards the other replicas
+    lease = f"files:{channel_id}"
+    try:
+        holder = await acquire_index_lease(lease)
+    except Exception as e:
+        logger.error(f"❌ Index lease error: {e}")
+        return None, False
+    if holder:
+        logger.info(f"⏭️ Indexing skipped: {holder.get('owner')} holds the lease until {holder.get('expires_at')}")
+        return None, False
+    
+    job = index_jobs.get(channel_id)
+    if job and job['status'] == 'running':
+        return job, False
+    
+    job = {
+        'channel_id': channel_id,
+        'lease': lease,
+        'full': full,
+        'status': 'running',
+        'processed': 0,
+        'written': 0,
+        'errors': 0,
+        'error': None,
+        'top': None,
+        'stop_at': None,
+        'resume_from': None,
+        'current_id': None,
+        'started_at': datetime.now(),
+        'started_mono': asyncio.get_running_loop().time(),
+        'finished_at': None,
+        'elapsed': None,
+        'task': None
+    }
+    index_jobs[channel_id] = job
+    job['task'] = asyncio.create_task(run_index_job(job))
+    return job, True
+
+def cancel_index_job(channel_id=None):
+    job = index_jobs.get(channel_id or Config.FILE_CHANNEL_ID)
+    if not job or job['status'] != 'running':
+        return False
+    job['task'].cancel()
+    return True
+
+def index_job_status(channel_id=None):
+    job = index_jobs.get(channel_id or Config.FILE_CHANNEL_ID)
+    if not job:
+        return {'status': 'idle'}
+    
+    elapsed = job['elapsed'] if job['elapsed'] is not None else asyncio.get_running_loop().time() - job['started_mono']
+    rate = job['processed'] / elapsed if elapsed > 0 else 0.0
+    
+    progress = None
+    eta = None
+    if job['top'] is not None and job['current_id'] is not None:
+        span = max(job['resume_from'] - job['stop_at'], 1)
+        done = max(job['resume_from'] - job['current_id'], 0)
+        progress = min(done / span, 1.0)
+        if job['status'] == 'running' and done > 0:
+            eta = (job['current_id'] - job['stop_at']) * elapsed / done
+    
+    return {
+        'status': job['status'],
+        'full': job['full'],
+        'processed': job['processed'],
+        'written': job['written'],
+        'errors': job['errors'],
+        'error': job['error'],
+        'files_per_sec': round(rate, 1),
+        'progress_percent': round(progress * 100, 1) if progress is not None else None,
+        'eta_seconds': int(eta) if eta is not None else None,
+        'started_at': job['started_at'].isoformat(),
+        'finished_at': job['finished_at'].isoformat() if job['finished_at'] else None
+    }
+
+# Poster page patterns, precompiled and listed in priority order per field
+LETTERBOXD_PATTERNS = {
+    'poster': [
+        re.compile(r'<meta property="og:image" content="(https?://[^"]+)"'),
+        re.compile(r'<img[^>]*class="[^"]*poster[^"]*"[^>]*src="(https?://[^"]+)"'),
+        re.compile(r'data-image-url="(https?://[^"]+)"'),
+        re.compile(r'<img[^>]*data-src="(https?://[^"]+)"[^>]*class="[^"]*poster[^"]*"'),
+    ],
+    'rating': [re.compile(r'<meta name="twitter:data2" content="([^"]+)"')]
+}
+JUSTWATCH_PATTERNS = {
+    'poster': [
+        re.compile(r'<meta property="og:image" content="(https?://[^"]+)"'),
+        re.compile(r'<img[^>]*class="[^"]*picture[^"]*"[^>]*src="(https?://[^"]+)"'),
+        re.compile(r'background-image:\s*url\((https?://[^)]+)\)'),
+        re.compile(r'<img[^>]*data-src="(https?://[^"]+)"[^>]*alt="[^"]*poster[^"]*"'),
+    ]
+}
+IMDB_FIND_PATTERNS = {
+    'poster': [re.compile(r'<img[^>]*src="(https?://[^"]+imdb[^"]+\.jpg[^"]*)"')]
+}
+HEAD_END = re.compile(r'</head\s*>', re.IGNORECASE)
+
+async def scan_html(response, patterns, optional=(), max_bytes=512 * 1024):
+    """Match patterns on an HTML response as chunks arrive, then close it early"""
+    # Done when every field has its top-priority match, or past </head> once
+    # every required field has any match
+    decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+    found = {}
+    rank = {}
+    tail = ''
+    head_done = False
+    total = 0
+    
+    try:
+        async for chunk in response.content.iter_chunked(16384):
+            total += len(chunk)
+            text = tail + decoder.decode(chunk)
+            for name, regexes in patterns.items():
+                for i, rx in enumerate(regexes[:rank.get(name, len(regexes))]):
+                    m = rx.search(text)
+                    if m:
+                        found[name], rank[name] = m.group(1), i
+                        break
+            head_done = head_done or bool(HEAD_END.search(text))
+            
+            if all(rank.get(name) == 0 for name in patterns):
+                break
+            if head_done and all(name in found for name in patterns if name not in optional):
+                break
+            if total >= max_bytes:
+                break
+            # Keep an overlap so tags split across chunks still match
+            tail = text[-2048:]
+    finally:
+        response.close()
+    
+    return found
+
+class PosterSourceError(Exception):
+    """A poster source is down or rate-limiting us (as opposed to not knowing the title)"""
+
+SOURCE_ERRORS = (PosterSourceError, aiohttp.ClientError, asyncio.TimeoutError)
+
+def check_source_status(r):
+    if r.status == 429 or r.status >= 500:
+        raise PosterSourceError(f"HTTP {r.status} from {r.url.host}")
 
 async def get_poster_letterboxd(title, session):
     """Letterboxd poster fetcher - HIGHEST QUALITY & SUCCESS RATE"""
@@ -357,43 +1433,32 @@ async def get_poster_letterboxd(title, session):
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                     'Accept-Language': 'en-US,en;q=0.5'
                 }) as r:
+                    check_source_status(r)
                     if r.status == 200:
-                        html_content = await r.text()
-                        
-                        # Multiple patterns for poster extraction
-                        poster_patterns = [
-                            r'<meta property="og:image" content="([^"]+)"',
-                            r'<img[^>]*class="[^"]*poster[^"]*"[^>]*src="([^"]+)"',
-                            r'data-image-url="([^"]+)"',
-                            r'<img[^>]*data-src="([^"]+)"[^>]*class="[^"]*poster[^"]*"',
-                        ]
-                        
-                        for pattern in poster_patterns:
-                            poster_match = re.search(pattern, html_content)
-                            if poster_match:
-                                poster_url = poster_match.group(1)
-                                if poster_url and poster_url.startswith('http'):
-                                    # HIGH QUALITY conversion
-                                    if 'cloudfront.net' in poster_url:
-                                        poster_url = poster_url.replace('-0-500-0-750', '-0-1000-0-1500')
-                                        poster_url = poster_url.replace('-0-230-0-345', '-0-1000-0-1500')
-                                        poster_url = poster_url.replace('-0-150-0-225', '-0-1000-0-1500')
-                                    elif 's.ltrbxd.com' in poster_url:
-                                        poster_url = poster_url.replace('/width/500/', '/width/1000/')
-                                        poster_url = poster_url.replace('/width/230/', '/width/1000/')
-                                    
-                                    # Get rating
-                                    rating_match = re.search(r'<meta name="twitter:data2" content="([^"]+)"', html_content)
-                                    rating = rating_match.group(1) if rating_match else '0.0'
-                                    
-                                    res = {'poster_url': poster_url, 'source': 'Letterboxd', 'rating': rating}
-                                    movie_db['stats']['letterboxd'] += 1
-                                    logger.info(f"    ✅ LETTERBOXD SUCCESS: {title}")
-                                    return res
+                        found = await scan_html(r, LETTERBOXD_PATTERNS, optional=('rating',))
+                        poster_url = found.get('poster')
+                        if poster_url:
+                            # HIGH QUALITY conversion
+                            if 'cloudfront.net' in poster_url:
+                                poster_url = poster_url.replace('-0-500-0-750', '-0-1000-0-1500')
+                                poster_url = poster_url.replace('-0-230-0-345', '-0-1000-0-1500')
+                                poster_url = poster_url.replace('-0-150-0-225', '-0-1000-0-1500')
+                            elif 's.ltrbxd.com' in poster_url:
+                                poster_url = poster_url.replace('/width/500/', '/width/1000/')
+                                poster_url = poster_url.replace('/width/230/', '/width/1000/')
+                            
+                            res = {'poster_url': poster_url, 'source': 'Letterboxd', 'rating': found.get('rating', '0.0')}
+                            logger.info(f"    ✅ LETTERBOXD SUCCESS: {title}")
+                            return res
+            except SOURCE_ERRORS:
+                raise
             except Exception as e:
                 continue
         
         return None
+    except SOURCE_ERRORS as e:
+        logger.info(f"    ⚠️ Letterboxd unavailable: {e}")
+        raise
     except Exception as e:
         logger.info(f"    ⚠️ Letterboxd failed: {e}")
         return None
@@ -412,6 +1477,7 @@ async def get_poster_imdb(title, session):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json'
         }) as r:
+            check_source_status(r)
             if r.status == 200:
                 data = await r.json()
                 if data.get('d'):
@@ -426,7 +1492,6 @@ async def get_poster_imdb(title, session):
                                 
                                 rating = str(item.get('yr', '0.0'))
                                 res = {'poster_url': poster_url, 'source': 'IMDb', 'rating': rating}
-                                movie_db['stats']['imdb'] += 1
                                 logger.info(f"    ✅ IMDb SUCCESS: {title}")
                                 return res
         
@@ -435,19 +1500,20 @@ async def get_poster_imdb(title, session):
         async with session.get(imdb_search_url, timeout=8, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }) as r:
+            check_source_status(r)
             if r.status == 200:
-                html_content = await r.text()
-                poster_match = re.search(r'<img[^>]*src="([^"]+imdb[^"]+\.jpg[^"]*)"', html_content)
-                if poster_match:
-                    poster_url = poster_match.group(1)
-                    if poster_url and poster_url.startswith('http'):
-                        poster_url = poster_url.replace('._V1_', '._V1_UX512_')
-                        res = {'poster_url': poster_url, 'source': 'IMDb', 'rating': '0.0'}
-                        movie_db['stats']['imdb'] += 1
-                        logger.info(f"    ✅ IMDb SUCCESS (Alt): {title}")
-                        return res
+                found = await scan_html(r, IMDB_FIND_PATTERNS)
+                poster_url = found.get('poster')
+                if poster_url:
+                    poster_url = poster_url.replace('._V1_', '._V1_UX512_')
+                    res = {'poster_url': poster_url, 'source': 'IMDb', 'rating': '0.0'}
+                    logger.info(f"    ✅ IMDb SUCCESS (Alt): {title}")
+                    return res
         
         return None
+    except SOURCE_ERRORS as e:
+        logger.info(f"    ⚠️ IMDb unavailable: {e}")
+        raise
     except Exception as e:
         logger.info(f"    ⚠️ IMDb failed: {e}")
         return None
@@ -471,37 +1537,30 @@ async def get_poster_justwatch(title, session):
                 async with session.get(justwatch_url, timeout=8, headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 }) as r:
+                    check_source_status(r)
                     if r.status == 200:
-                        html_content = await r.text()
-                        
-                        # Multiple patterns for poster
-                        patterns = [
-                            r'<meta property="og:image" content="([^"]+)"',
-                            r'<img[^>]*class="[^"]*picture[^"]*"[^>]*src="([^"]+)"',
-                            r'background-image:\s*url\(([^)]+)\)',
-                            r'<img[^>]*data-src="([^"]+)"[^>]*alt="[^"]*poster[^"]*"',
-                        ]
-                        
-                        for pattern in patterns:
-                            poster_match = re.search(pattern, html_content)
-                            if poster_match:
-                                poster_url = poster_match.group(1)
-                                if poster_url and poster_url.startswith('http'):
-                                    # Ensure HTTPS and high quality
-                                    poster_url = poster_url.replace('http://', 'https://')
-                                    if 'jw-img' in poster_url:
-                                        poster_url = poster_url.replace('{format}', 'original')
-                                    if 'scale' in poster_url:
-                                        poster_url = poster_url.replace('scale=100', 'scale=400')
-                                    
-                                    res = {'poster_url': poster_url, 'source': 'JustWatch', 'rating': '0.0'}
-                                    movie_db['stats']['justwatch'] += 1
-                                    logger.info(f"    ✅ JustWatch SUCCESS: {title}")
-                                    return res
+                        found = await scan_html(r, JUSTWATCH_PATTERNS)
+                        poster_url = found.get('poster')
+                        if poster_url:
+                            # Ensure HTTPS and high quality
+                            poster_url = poster_url.replace('http://', 'https://')
+                            if 'jw-img' in poster_url:
+                                poster_url = poster_url.replace('{format}', 'original')
+                            if 'scale' in poster_url:
+                                poster_url = poster_url.replace('scale=100', 'scale=400')
+                            
+                            res = {'poster_url': poster_url, 'source': 'JustWatch', 'rating': '0.0'}
+                            logger.info(f"    ✅ JustWatch SUCCESS: {title}")
+                            return res
+            except SOURCE_ERRORS:
+                raise
             except:
                 continue
         
         return None
+    except SOURCE_ERRORS as e:
+        logger.info(f"    ⚠️ JustWatch unavailable: {e}")
+        raise
     except Exception as e:
         logger.info(f"    ⚠️ JustWatch failed: {e}")
         return None
@@ -536,46 +1595,78 @@ async def get_poster_impawards(title, session):
         for poster_url in formats:
             try:
                 async with session.head(poster_url, timeout=5) as r:
+                    check_source_status(r)
                     if r.status == 200:
                         res = {'poster_url': poster_url, 'source': 'IMPAwards', 'rating': '0.0'}
-                        movie_db['stats']['impawards'] += 1
                         logger.info(f"    ✅ IMPAwards SUCCESS: {title}")
                         return res
+            except SOURCE_ERRORS:
+                raise
             except:
                 continue
         
         return None
+    except SOURCE_ERRORS as e:
+        logger.info(f"    ⚠️ IMPAwards unavailable: {e}")
+        raise
     except Exception as e:
         logger.info(f"    ⚠️ IMPAwards failed: {e}")
         return None
 
 async def get_poster_omdb_tmdb(title, session):
     """OMDB + TMDB combined - RELIABLE BACKUP"""
+    errors = []
+    answered = False
     try:
         logger.info(f"    🎬 Trying OMDB+TMDB (Backup)...")
         
-        # Try OMDB first
-        for api_key in Config.OMDB_KEYS:
+        # Try OMDB first; move to another key only when one is rejected or errors
+        for attempt in range(len(Config.OMDB_KEYS)):
+            api_key = omdb_keys.acquire()
+            if not api_key:
+                if attempt == 0:
+                    errors.append('OMDB keys exhausted')
+                break
             try:
                 url = f"http://www.omdbapi.com/?t={urllib.parse.quote(title)}&apikey={api_key}"
                 async with session.get(url, timeout=8) as r:
+                    omdb_keys.report(api_key, r.status)
+                    if r.status >= 500:
+                        raise PosterSourceError(f"OMDB HTTP {r.status}")
                     if r.status == 200:
                         data = await r.json()
+                        if 'limit' in (data.get('Error') or '').lower():
+                            omdb_keys.report(api_key, 429)
+                            errors.append('OMDB rate limited')
+                            continue
                         if data.get('Response') == 'True' and data.get('Poster') and data.get('Poster') != 'N/A':
                             poster_url = data['Poster'].replace('http://', 'https://')
                             res = {'poster_url': poster_url, 'source': 'OMDB', 'rating': data.get('imdbRating', '0.0')}
-                            movie_db['stats']['omdb'] += 1
                             logger.info(f"    ✅ OMDB SUCCESS: {title}")
                             return res
+                        answered = True
+                        break
+                    errors.append(f"OMDB HTTP {r.status}")
+            except SOURCE_ERRORS as e:
+                errors.append(e)
+                continue
             except:
                 continue
         
         # Try TMDB
-        for api_key in Config.TMDB_KEYS:
+        for attempt in range(len(Config.TMDB_KEYS)):
+            api_key = tmdb_keys.acquire()
+            if not api_key:
+                if attempt == 0:
+                    errors.append('TMDB keys exhausted')
+                break
             try:
                 url = "https://api.themoviedb.org/3/search/movie"
                 params = {'api_key': api_key, 'query': title}
                 async with session.get(url, params=params, timeout=8) as r:
+                    tmdb_keys.report(api_key, r.status)
+                    if r.status >= 500:
+                        raise PosterSourceError(f"TMDB HTTP {r.status}")
                     if r.status == 200:
                         data = await r.json()
                         if data.get('results') and len(data['results']) > 0:
@@ -585,63 +1676,344 @@ async def get_poster_omdb_tmdb(title, session):
                                 # High quality TMDB poster
                                 poster_url = f"https://image.tmdb.org/t/p/w780{poster_path}"
                                 res = {'poster_url': poster_url, 'source': 'TMDB', 'rating': str(result.get('vote_average', 0.0))}
-                                movie_db['stats']['tmdb'] += 1
                                 logger.info(f"    ✅ TMDB SUCCESS: {title}")
                                 return res
+                        answered = True
+                        break
+                    errors.append(f"TMDB HTTP {r.status}")
+            except SOURCE_ERRORS as e:
+                errors.append(e)
+                continue
             except:
                 continue
-        
-        return None
     except Exception as e:
         logger.info(f"    ⚠️ OMDB+TMDB failed: {e}")
         return None
+    
+    if errors and not answered:
+        # Both APIs down, rate-limiting us or out of keys: let the breaker count it
+        raise PosterSourceError(f"OMDB+TMDB unavailable: {errors[-1]}")
+    return None
 
-async def get_poster_guaranteed(title, session):
-    """100% GUARANTEED POSTER - ALL SOURCES WORKING"""
-    ck = title.lower().strip()
+def custom_poster(title):
+    year_match = re.search(r'\b(19|20)\d{2}\b', title)
+    year = year_match.group() if year_match else ""
+    return {
+        'poster_url': f"{Config.BACKEND_URL}/api/poster?title={urllib.parse.quote(title)}&year={year}", 
+        'source': 'CUSTOM', 
+        'rating': '0.0'
+    }
+
+async def load_poster(key):
+    """L2 lookup in the posters collection; expired docs count as misses"""
+    if posters_col is None:
+        return None
+    try:
+        doc = await posters_col.find_one({'_id': key, 'expires_at': {'$gt': datetime.now()}})
+        return doc['poster'] if doc else None
+    except Exception as e:
+        logger.debug(f"Poster load error: {e}")
+        return None
+
+async def store_poster(key, poster, found=True):
+    """Persist a poster, or a 'not found' result with the shorter negative TTL"""
+    if posters_col is None:
+        return
+    ttl = Config.POSTER_TTL if found else Config.POSTER_NEGATIVE_TTL
+    now = datetime.now()
+    try:
+        await posters_col.update_one(
+            {'_id': key},
+            {'$set': {'poster': poster, 'found': found, 'updated_at': now, 'expires_at': now + timedelta(seconds=ttl)}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.debug(f"Poster store error: {e}")
+
+# ALL SOURCES IN BASE PRIORITY ORDER (reordered at runtime by source health)
+POSTER_SOURCES = [
+    ('letterboxd', get_poster_letterboxd),   # 1st - Highest quality
+    ('imdb', get_poster_imdb),               # 2nd - Very reliable
+    ('justwatch', get_poster_justwatch),     # 3rd - Good quality
+    ('impawards', get_poster_impawards),     # 4th - Official posters
+    ('omdb_tmdb', get_poster_omdb_tmdb),     # 5th - Reliable backup
+]
+
+source_health = {
+    name: {
+        'successes': 0, 'misses': 0, 'failures': 0,
+        'latency': 2.0, 'consecutive_failures': 0,
+        'state': 'closed', 'opened_at': 0.0, 'probing': False
+    } for name, _ in POSTER_SOURCES
+}
+
+def record_source(name, outcome, latency):
+    """Update latency/success stats and the circuit breaker for one source call"""
+    h = source_health[name]
+    h['probing'] = False
+    if outcome == 'failure':
+        h['failures'] += 1
+        h['consecutive_failures'] += 1
+        if h['state'] == 'half_open' or h['consecutive_failures'] >= Config.BREAKER_FAILURES:
+            if h['state'] != 'open':
+                logger.warning(f"    🔌 Circuit OPEN for {name} after {h['consecutive_failures']} failures")
+            h['state'] = 'open'
+            h['opened_at'] = time.monotonic()
+        return
+    
+    h['successes' if outcome == 'success' else 'misses'] += 1
+    h['latency'] = 0.8 * h['latency'] + 0.2 * latency
+    h['consecutive_failures'] = 0
+    if h['state'] != 'closed':
+        logger.info(f"    🔌 Circuit CLOSED for {name}")
+        h['state'] = 'closed'
+
+def expected_time_to_success(name):
+    h = source_health[name]
+    hit_rate = (h['successes'] + 1) / (h['successes'] + h['misses'] + h['failures'] + 2)
+    return h['latency'] / hit_rate
+
+def ordered_poster_sources():
+    """Sources allowed by their breakers, in POSTER_SOURCES priority order"""
+    # Health only decides who may run; the winner is still picked by priority so a
+    # fast API never outranks Letterboxd's higher-quality posters
+    now = time.monotonic()
+    allowed = []
+    for name, source in POSTER_SOURCES:
+        h = source_health[name]
+        if h['state'] == 'open' and now - h['opened_at'] >= Config.BREAKER_COOLDOWN:
+            h['state'] = 'half_open'
+        if h['state'] == 'open' or (h['state'] == 'half_open' and h['probing']):
+            continue
+        if h['state'] == 'half_open':
+            h['probing'] = True  # one probe request at a time
+        allowed.append((name, source))
+    return allowed
+
+def task_result(task):
+    if not task.done() or task.cancelled() or task.exception() is not None:
+        return None
+    return task.result()
+
+async def race_poster_sources(title, session, timeout):
+    """Run all sources at once; the highest-ranked success wins -> (result, timed_out)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    started = loop.time()
+    sources = ordered_poster_sources()
+    if not sources:
+        return None, True
+    
+    def on_done(name):
+        def callback(task):
+            if task.cancelled():
+                # Lost the race: neutral outcome, but free a half-open probe slot
+                source_health[name]['probing'] = False
+                return
+            outcome = 'failure' if task.exception() is not None else ('success' if task.result() else 'miss')
+            record_source(name, outcome, loop.time() - started)
+        return callback
+    
+    tasks = []
+    for name, source in sources:
+        task = asyncio.create_task(source(title, session))
+        task.add_done_callback(on_done(name))
+        tasks.append(task)
     
-    # SMART CACHING - Check cache first
-    if ck in movie_db['poster_cache']:
-        c, ct = movie_db['poster_cache'][ck]
-        if (datetime.now() - ct).seconds < 3600:
-            movie_db['stats']['cache_hits'] += 1
-            logger.info(f"  📦 Cache hit: {title}")
-            return c
+    try:
+        pending = set(tasks)
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            _, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if not task.done():
+                    break  # a higher-ranked source may still win
+                result = task_result(task)
+                if result:
+                    return result, False
+            else:
+                return None, False
+        
+        # Out of budget: take the best source that has already answered
+        for task in tasks:
+            result = task_result(task)
+            if result:
+                return result, False
+        return None, True
+    finally:
+        # Still running at the deadline is neutral: the request may only have been queued
+        # behind our own connection pool, so it says nothing about the source's health
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def resolve_poster(title, ck):
+    """Resolve a poster from MongoDB (L2) or the live sources and fill L1"""
+    stored = await load_poster(ck)
+    if stored:
+        movie_db['poster_cache'].set(ck, stored)
+        movie_db['stats']['cache_hits'] += 1
+        logger.info(f"  🗄️ Stored poster hit: {title}")
+        return stored
     
     logger.info(f"  🎨 FETCHING POSTER: {title}")
+    result, timed_out = await race_poster_sources(title, get_http_session(), Config.POSTER_TITLE_BUDGET)
     
-    # ALL SOURCES IN PRIORITY ORDER
-    sources = [
-        get_poster_letterboxd,   # 1st - Highest quality
-        get_poster_imdb,         # 2nd - Very reliable
-        get_poster_justwatch,    # 3rd - Good quality
-        get_poster_impawards,    # 4th - Official posters
-        get_poster_omdb_tmdb,    # 5th - Reliable backup
-    ]
+    if result:
+        movie_db['stats'][result['source'].lower()] += 1
+        movie_db['poster_cache'].set(ck, result)
+        await store_poster(ck, result)
+        return result
     
-    for source in sources:
-        result = await source(title, session)
-        if result:
-            movie_db['poster_cache'][ck] = (result, datetime.now())
-            return result
+    if timed_out:
+        # Not a real miss: keep the placeholder briefly in L1 only, so a later request retries
+        logger.info(f"    ⏱️ POSTER BUDGET EXHAUSTED, USING CUSTOM POSTER: {title}")
+        movie_db['stats']['custom'] += 1
+        res = custom_poster(title)
+        movie_db['poster_cache'].set(ck, res, ttl=300)
+        return res
     
     # 100% FALLBACK - Custom poster (NEVER FAILS)
     logger.info(f"    ⚠️ ALL SOURCES FAILED, USING CUSTOM POSTER: {title}")
     movie_db['stats']['custom'] += 1
     
-    year_match = re.search(r'\b(19|20)\d{2}\b', title)
-    year = year_match.group() if year_match else ""
-    
-    res = {
-        'poster_url': f"{Config.BACKEND_URL}/api/poster?title={urllib.parse.quote(title)}&year={year}", 
-        'source': 'CUSTOM', 
-        'rating': '0.0'
-    }
-    movie_db['poster_cache'][ck] = (res, datetime.now())
+    res = custom_poster(title)
+    movie_db['poster_cache'].set(ck, res)
+    await store_poster(ck, res, found=False)
     logger.info(f"    ✅ CUSTOM POSTER GENERATED: {title}")
     return res
 
+def poster_flight(title, ck):
+    """Return the in-flight lookup for a title, starting one if needed"""
+    task = movie_db['inflight'].get(ck)
+    if task is None:
+        task = asyncio.create_task(resolve_poster(title, ck))
+        movie_db['inflight'][ck] = task
+        task.add_done_callback(lambda _: movie_db['inflight'].pop(ck, None))
+    else:
+        movie_db['stats']['coalesced'] += 1
+    return task
+
+async def get_poster_guaranteed(title):
+    """100% GUARANTEED POSTER - ALL SOURCES WORKING"""
+    ck = normalize_title(title) or title.lower().strip()
+    
+    # SMART CACHING - stale entries are served at once and refreshed in background
+    cached = movie_db['poster_cache'].get(ck)
+    if cached:
+        c, fresh = cached
+        movie_db['stats']['cache_hits'] += 1
+        if not fresh and ck not in movie_db['inflight']:
+            poster_flight(title, ck)
+            logger.info(f"  📦 Stale cache hit, refreshing: {title}")
+        else:
+            logger.info(f"  📦 Cache hit: {title}")
+        return c
+    
+    # All concurrent callers share one lookup, itself bounded by POSTER_TITLE_BUDGET
+    return await asyncio.shield(poster_flight(title, ck))
+
+PREFETCH_HOME, PREFETCH_POST, PREFETCH_FILE = 0, 1, 2
+
+poster_prefetch = {
+    'queue': None,
+    'queued': {},
+    'seq': 0,
+    'resolved': 0,
+    'dropped': 0
+}
+
+def enqueue_poster_prefetch(title, priority):
+    """Queue a title for background poster resolution unless it is already cached"""
+    queue = poster_prefetch['queue']
+    if queue is None or not title:
+        return
+    ck = normalize_title(title) or title.lower().strip()
+    cached = movie_db['poster_cache'].get(ck)
+    if cached and cached[1]:
+        return
+    # Re-queue only when the title moves up in priority; stale entries are skipped by the worker
+    if poster_prefetch['queued'].get(ck, PREFETCH_FILE + 1) <= priority:
+        return
+    try:
+        poster_prefetch['seq'] += 1
+        queue.put_nowait((priority, poster_prefetch['seq'], title))
+        poster_prefetch['queued'][ck] = priority
+    except asyncio.QueueFull:
+        poster_prefetch['dropped'] += 1
+
+def home_feed_titles(limit=30):
+    """Newest distinct titles of the main channel from the post index"""
+    posts = [p for p in post_index['entries'].values() if p['channel_id'] == Config.MAIN_CHANNEL_ID]
+    posts.sort(key=lambda p: p['message_id'], reverse=True)
+    titles = []
+    seen = set()
+    for post in posts:
+        tk = post['title'].lower().strip()
+        if tk not in seen:
+            seen.add(tk)
+            titles.append(post['title'])
+            if len(titles) >= limit:
+                break
+    return titles
+
+async def poster_prefetch_worker():
+    queue = poster_prefetch['queue']
+    while True:
+        priority, _, title = await queue.get()
+        ck = normalize_title(title) or title.lower().strip()
+        if poster_prefetch['queued'].get(ck) != priority:
+            continue  # superseded by a higher-priority entry
+        poster_prefetch['queued'].pop(ck, None)
+        cached = movie_db['poster_cache'].get(ck)
+        if cached and cached[1]:
+            continue
+        try:
+            await poster_flight(title, ck)
+            poster_prefetch['resolved'] += 1
+        except Exception as e:
+            logger.debug(f"Poster prefetch error: {e}")
+
+async def watch_new_files():
+    """Queue posters for files indexed since the last poll (indexer and live ingestion)"""
+    since = datetime.now()
+    while True:
+        await asyncio.sleep(60)
+        if files_col is None:
+            continue
+        try:
+            cursor = files_col.find(
+                {'indexed_at': {'$gt': since}},
+                {'title': 1, 'indexed_at': 1, '_id': 0}
+            ).sort('indexed_at', 1).limit(1000)
+            async for doc in cursor:
+                since = max(since, doc['indexed_at'])
+                enqueue_poster_prefetch(doc['title'], PREFETCH_FILE)
+        except Exception as e:
+            logger.error(f"❌ Prefetch file watch error: {e}")
+
+def start_poster_prefetch():
+    poster_prefetch['queue'] = asyncio.PriorityQueue(maxsize=Config.POSTER_PREFETCH_QUEUE)
+    for _ in range(Config.POSTER_PREFETCH_CONCURRENCY):
+        asyncio.create_task(poster_prefetch_worker())
+    asyncio.create_task(watch_new_files())
+
 async def get_live_posts(channel_id, limit=50):
+    if posts_col is not None and post_index['ready']:
+        try:
+            cursor = posts_col.find({'channel_id': channel_id}, {'_id': 0}).sort('message_id', -1).limit(limit)
+            posts = []
+            async for doc in cursor:
+                doc['channel_name'] = channel_name(channel_id)
+                doc['is_new'] = is_new(doc['date']) if doc.get('date') else False
+                posts.append(doc)
+            logger.info(f"🗂️ STORED: {channel_name(channel_id)} ({len(posts)} posts)")
+            return posts
+        except Exception as e:
+            logger.error(f"  ❌ Stored posts error: {e}")
+    
     if not User:
         return []
     
@@ -672,83 +2044,223 @@ async def get_live_posts(channel_id, limit=50):
     
     return posts
 
-async def search_movies_live(query, limit=12, page=1):
-    """Enhanced search with post availability tracking"""
-    offset = (page - 1) * limit
-    logger.info(f"🔴 SEARCH: '{query}' | Page: {page}")
-    
+async def search_channel_posts(channel_id, query, out):
+    """Telegram search of one text channel, filling `out` as results arrive"""
+    cname = channel_name(channel_id)
     query_lower = query.lower()
-    posts_dict = {}
-    files_dict = {}
+    async for msg in User.search_messages(channel_id, query=query, limit=200):
+        if msg.text and len(msg.text) > 15:
+            title = extract_title_smart(msg.text)
+            if title and query_lower in title.lower():
+                norm_title = normalize_title(title)
+                if norm_title not in out:
+                    out[norm_title] = {
+                        'title': title,
+                        'content': format_post(msg.text),
+                        'channel': cname,
+                        'channel_id': channel_id,
+                        'message_id': msg.id,
+                        'date': msg.date.isoformat() if isinstance(msg.date, datetime) else msg.date,
+                        'is_new': is_new(msg.date) if msg.date else False,
+                        'has_file': False,
+                        'has_post': True,
+                        'quality_options': {}
+                    }
+
+async def search_files(query, out, stats, exclude=(), fetch=50, match=None):
+    """Mongo text search (or `match`) over indexed files, grouped by title and quality on the server"""
+    if files_col is None:
+        return
+    # Titles in `exclude` (already found as posts) always come back so they can be linked;
+    # the rest are ranked like the merged list (date, then textScore) and cut to `fetch`
+    exclude = list(exclude)
+    pipeline = [
+        {'$match': match or {'$text': {'$search': query}}},
+        {'$project': {
+            '_id': 0, 'title': 1, 'normalized_title': 1, 'quality': 1, 'channel_id': 1,
+            'message_id': 1, 'file_size': 1, 'file_name': 1, 'date': 1,
+            'score': {'$literal': 0} if match else {'$meta': 'textScore'}
+        }},
+        {'$sort': {'date': -1}},
+        {'$group': {
+            '_id': {'t': '$normalized_title', 'q': '$quality'},
+            'title': {'$first': '$title'},
+            'date': {'$max': '$date'},
+            'score': {'$max': '$score'},
+            'file': {'$first': {
+                'channel_id': '$channel_id', 'message_id': '$message_id',
+                'file_size': '$file_size', 'file_name': '$file_name'
+            }}
+        }},
+        {'$group': {
+            '_id': '$_id.t',
+            'title': {'$first': '$title'},
+            'date': {'$max': '$date'},
+            'score': {'$max': '$score'},
+            'qualities': {'$push': {'q': '$_id.q', 'file': '$file'}}
+        }},
+        {'$facet': {
+            'total': [{'$count': 'n'}],
+            'linked': [{'$match': {'_id': {'$in': exclude}}}],
+            'items': [
+                {'$match': {'_id': {'$nin': exclude}}},
+                {'$sort': {'date': -1, 'score': -1}},
+                {'$limit': fetch}
+            ]
+        }}
+    ]
     
-    # Search text channels
-    for channel_id in Config.TEXT_CHANNEL_IDS:
+    async for facet in files_col.aggregate(pipeline, allowDiskUse=True):
+        stats['total'] = facet['total'][0]['n'] if facet['total'] else 0
+        for doc in facet['linked'] + facet['items']:
+            quality_options = {}
+            for entry in doc['qualities']:
+                quality, f = entry.get('q'), entry['file']
+                if quality and quality not in quality_options:
+                    quality_options[quality] = {
+                        'file_id': f"{f.get('channel_id', Config.FILE_CHANNEL_ID)}_{f.get('message_id')}_{quality}",
+                        'file_size': f.get('file_size', 0),
+                        'file_name': f.get('file_name', '')
+                    }
+            norm_title = doc['_id'] or normalize_title(doc['title'])
+            out[norm_title] = {
+                'title': doc['title'],
+                'quality_options': quality_options,
+                'date': doc['date'].isoformat() if isinstance(doc['date'], datetime) else doc['date']
+            }
+
+async def run_search_sources(sources):
+    """Run search sources concurrently under per-source deadlines; returns the degraded ones"""
+    async def bounded(name, coro):
         try:
-            cname = channel_name(channel_id)
-            logger.info(f"  🔴 {cname}...")
-            count = 0
-            
-            try:
-                async for msg in User.search_messages(channel_id, query=query, limit=200):
-                    if msg.text and len(msg.text) > 15:
-                        title = extract_title_smart(msg.text)
-                        if title and query_lower in title.lower():
-                            norm_title = normalize_title(title)
-                            if norm_title not in posts_dict:
-                                posts_dict[norm_title] = {
-                                    'title': title,
-                                    'content': format_post(msg.text),
-                                    'channel': cname,
-                                    'channel_id': channel_id,
-                                    'message_id': msg.id,
-                                    'date': msg.date.isoformat() if isinstance(msg.date, datetime) else msg.date,
-                                    'is_new': is_new(msg.date) if msg.date else False,
-                                    'has_file': False,
-                                    'has_post': True,
-                                    'quality_options': {}
-                                }
-                                count += 1
-            except Exception as e:
-                logger.error(f"    ❌ Search error: {e}")
-            
-            logger.info(f"    ✅ {count} posts")
-            
+            await asyncio.wait_for(coro, Config.SEARCH_SOURCE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"  ⏱️ {name} search timed out, using partial results")
+            return name
         except Exception as e:
-            logger.error(f"    ❌ Channel error: {e}")
+            logger.error(f"  ❌ {name} search error: {e}")
+            return name
+        return None
     
-    # Search files
+    tasks = [asyncio.create_task(bounded(name, coro)) for name, coro in sources]
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=Config.SEARCH_BUDGET)
+    for task in pending:
+        task.cancel()
+    degraded = [t.result() for t in done if t.result()]
+    degraded += [name for (name, _), t in zip(sources, tasks) if t in pending]
+    return degraded
+
+def search_rank_key(norm_title, item):
+    return (not item.get('is_new', False), not item['has_file'], item['date'] or '', norm_title)
+
+def encode_search_cursor(ck, key):
+    raw = json.dumps({'q': ck, 'k': list(key)}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_search_cursor(ck, cursor):
     try:
-        logger.info("📁 Files...")
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        k = data['k']
+        # (not is_new | similarity, bool, date, normalized title) - reject anything else so
+        # a forged cursor can't reach the key comparisons with incomparable types
+        if (data['q'] == ck and isinstance(k, list) and len(k) == 4
+                and isinstance(k[0], (bool, int, float)) and isinstance(k[1], bool)
+                and isinstance(k[2], str) and isinstance(k[3], str)):
+            return tuple(k)
+    except Exception:
+        pass
+    raise ValueError("Invalid cursor")
+
+def search_cursor_start(keys, key):
+    """Index of the first entry ranked after `key` in a list sorted by descending key"""
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keys[mid] >= key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def post_search_result(post):
+    return {
+        'title': post['title'],
+        'content': post['content'],
+        'channel': channel_name(post['channel_id']),
+        'channel_id': post['channel_id'],
+        'message_id': post['message_id'],
+        'date': post['date'].isoformat() if isinstance(post['date'], datetime) else post['date'],
+        'is_new': is_new(post['date']) if post['date'] else False,
+        'has_file': False,
+        'has_post': True,
+        'quality_options': {}
+    }
+
+async def fuzzy_search_results(query, posts_dict, files_dict, files_stats):
+    """Typo-tolerant fallback: resolve the closest titles from the trigram index"""
+    started = time.monotonic()
+    similar = dict(fuzzy_title_search(query))
+    if not similar:
+        return similar, []
+    
+    order = {cid: i for i, cid in enumerate(Config.TEXT_CHANNEL_IDS)}
+    for norm_title in similar:
+        keys = [k for k in title_grams['posts'].get(norm_title, ()) if k in post_index['entries']]
+        if keys:
+            key = min(keys, key=lambda k: (order.get(k[0], len(order)), -k[1]))
+            posts_dict[norm_title] = post_search_result(post_index['entries'][key])
+    
+    degraded = await run_search_sources([('Files', search_files(
+        query, files_dict, files_stats, exclude=list(posts_dict), fetch=len(similar),
+        match={'normalized_title': {'$in': list(similar)}}
+    ))])
+    logger.info(f"  🔤 Fuzzy: {len(similar)} similar titles in {(time.monotonic() - started) * 1000:.0f} ms")
+    return similar, degraded
+
+async def build_search_results(query, cap=None):
+    """Search every source and return the merged, ranked result list (first `cap` entries)"""
+    cap = cap or Config.SEARCH_MAX_RESULTS
+    logger.info(f"🔴 SEARCH: '{query}'")
+    
+    posts_dict = {}
+    files_dict = {}
+    files_stats = {'total': 0}
+    channel_results = {channel_id: {} for channel_id in Config.TEXT_CHANNEL_IDS}
+    sources = []
+    
+    # Search text channels (from the post index once it is built)
+    if post_index['ready']:
         count = 0
-        
-        if files_col is not None:
-            cursor = files_col.find({'$text': {'$search': query}})
-            async for doc in cursor:
-                try:
-                    norm_title = doc.get('normalized_title', normalize_title(doc['title']))
-                    quality = doc['quality']
-                    
-                    if norm_title not in files_dict:
-                        files_dict[norm_title] = {
-                            'title': doc['title'], 
-                            'quality_options': {}, 
-                            'date': doc['date'].isoformat() if isinstance(doc['date'], datetime) else doc['date']
-                        }
-                    
-                    if quality not in files_dict[norm_title]['quality_options']:
-                        files_dict[norm_title]['quality_options'][quality] = {
-                            'file_id': f"{doc.get('channel_id', Config.FILE_CHANNEL_ID)}_{doc.get('message_id')}_{quality}",
-                            'file_size': doc['file_size'],
-                            'file_name': doc['file_name']
-                        }
-                        count += 1
-                except Exception as e:
-                    logger.debug(f"File processing error: {e}")
-        
-        logger.info(f"  ✅ {count} files")
-        
-    except Exception as e:
-        logger.error(f"  ❌ Files error: {e}")
+        for post in search_post_index(query):
+            norm_title = post['normalized_title']
+            if norm_title not in posts_dict:
+                posts_dict[norm_title] = post_search_result(post)
+                count += 1
+        logger.info(f"  🗂️ Post index: {count} posts")
+    elif User:
+        for channel_id in Config.TEXT_CHANNEL_IDS:
+            sources.append((channel_name(channel_id), search_channel_posts(channel_id, query, channel_results[channel_id])))
+    
+    # Channel searches and the file query run side by side. Only the file titles that can
+    # make the ranked list are fetched; while channel results are unknown, leave room for overlaps
+    fetch = cap + (200 * len(sources))
+    sources.append(('Files', search_files(query, files_dict, files_stats, exclude=list(posts_dict), fetch=fetch)))
+    degraded = await run_search_sources(sources)
+    
+    # Keep channel priority order when the same title shows up in both
+    for channel_id in Config.TEXT_CHANNEL_IDS:
+        for norm_title, post_data in channel_results[channel_id].items():
+            posts_dict.setdefault(norm_title, post_data)
+    
+    logger.info(f"  ✅ {len(posts_dict)} posts, {len(files_dict)} file titles{' | degraded: ' + ', '.join(degraded) if degraded else ''}")
+    
+    # Nothing matched exactly: fall back to the closest titles
+    similar = {}
+    if not posts_dict and not files_dict:
+        similar, fuzzy_degraded = await fuzzy_search_results(query, posts_dict, files_dict, files_stats)
+        degraded += fuzzy_degraded
     
     # Merge results
     merged = {}
@@ -771,23 +2283,158 @@ async def search_movies_live(query, limit=12, page=1):
                 'quality_options': file_data['quality_options']
             }
     
-    results_list = list(merged.values())
-    results_list.sort(key=lambda x: (not x.get('is_new', False), not x['has_file'], x['date']), reverse=True)
+    if similar:
+        for norm_title, item in merged.items():
+            item['fuzzy'] = True
+            item['similarity'] = round(similar.get(norm_title, 0), 3)
+        rank_key = lambda norm_title, item: (item['similarity'], item['has_file'], item['date'] or '', norm_title)
+    else:
+        rank_key = search_rank_key
+    ranked = sorted(
+        ((rank_key(norm_title, item), item) for norm_title, item in merged.items()),
+        key=lambda entry: entry[0], reverse=True
+    )[:cap]
+    
+    linked = sum(1 for norm_title in files_dict if norm_title in posts_dict)
+    if files_stats['total'] <= len(files_dict):
+        total = len(merged)  # every matching file title was fetched: the merge is exact
+    else:
+        total = max(len(merged), len(posts_dict) + files_stats['total'] - linked)
+    logger.info(f"✅ Total: {total} | Ranked: {len(ranked)}")
+    
+    return {
+        'keys': [key for key, _ in ranked],
+        'items': [item for _, item in ranked],
+        'total': total,
+        'degraded': degraded,
+        'fuzzy': bool(similar),
+        'cap': cap
+    }
+
+def register_search_terms(ck):
+    """Remember which terms a cached query depends on so new titles can invalidate it"""
+    postings = search_terms['postings']
+    if len(postings) > Config.SEARCH_CACHE_SIZE * 8:
+        # Evicted queries leave terms behind; rebuild from what is still cached
+        postings.clear()
+        search_terms['terms'] = []
+        for key in search_cache.keys():
+            if key != ck:
+                register_search_terms(key)
+    for term in set(tokenize(ck)):
+        cks = postings.get(term)
+        if cks is None:
+            cks = postings[term] = set()
+            bisect.insort(search_terms['terms'], term)
+        cks.add(ck)
+
+def forget_search_terms(ck):
+    postings = search_terms['postings']
+    for term in set(tokenize(ck)):
+        cks = postings.get(term)
+        if cks is None:
+            continue
+        cks.discard(ck)
+        if not cks:
+            del postings[term]
+            i = bisect.bisect_left(search_terms['terms'], term)
+            if i < len(search_terms['terms']) and search_terms['terms'][i] == term:
+                del search_terms['terms'][i]
+
+def invalidate_search_cache(titles):
+    """Drop cached searches that any of the newly added titles could match"""
+    postings = search_terms['postings']
+    terms = search_terms['terms']
+    if not postings:
+        return 0
+    stale = set()
+    for title in titles:
+        for token in set(tokenize(title)):
+            # Query terms are prefix-matched against titles ("aveng" -> "avengers")
+            for n in range(1, len(token) + 1):
+                stale |= postings.get(token[:n], set())
+            # and Mongo $text stems ("avengers" query -> "avenger" title)
+            i = bisect.bisect_left(terms, token)
+            while i < len(terms) and terms[i].startswith(token):
+                stale |= postings[terms[i]]
+                i += 1
+    for ck in stale:
+        search_cache.pop(ck)
+        forget_search_terms(ck)
+    search_terms['stats']['invalidated'] += len(stale)
+    return len(stale)
+
+async def search_movies_live(query, limit=12, page=1, cursor=None):
+    """Enhanced search with post availability tracking"""
+    ck = ' '.join(query.lower().split())
+    key = decode_search_cursor(ck, cursor) if cursor else None
+    
+    # Deeper pages slice the cached ranked list instead of searching again
+    cached = search_cache.get(ck)
+    if cached and cached[1]:
+        ranked = cached[0]
+        search_terms['stats']['hits'] += 1
+    elif ck in search_terms['inflight']:
+        # Same query already being searched: wait for it instead of hitting Telegram again
+        search_terms['stats']['coalesced'] += 1
+        ranked = await asyncio.shield(search_terms['inflight'][ck])
+    else:
+        search_terms['stats']['misses'] += 1
+        task = asyncio.ensure_future(build_search_results(query))
+        search_terms['inflight'][ck] = task
+        try:
+            ranked = await asyncio.shield(task)
+        finally:
+            if task.done():
+                search_terms['inflight'].pop(ck, None)
+            else:
+                task.add_done_callback(lambda _: search_terms['inflight'].pop(ck, None))
+        if ranked['degraded']:
+            ttl = 5
+        elif ranked['fuzzy'] or not ranked['items']:
+            # Typo queries don't share terms with the titles that would fix them, so
+            # invalidate_search_cache can't reach these entries: keep them short-lived
+            ttl = Config.SEARCH_MISS_TTL
+        else:
+            ttl = None
+        search_cache.set(ck, ranked, ttl=ttl)
+        register_search_terms(ck)
+    
+    start = search_cursor_start(ranked['keys'], key) if key else (page - 1) * limit
+    # Past the ranked window: widen it so every advertised page stays reachable
+    while ranked['total'] > len(ranked['items']) and start + limit >= len(ranked['items']):
+        cap = max(ranked['cap'] * 2, start + limit + Config.SEARCH_MAX_RESULTS)
+        wider = await build_search_results(query, cap)
+        if len(wider['items']) <= len(ranked['items']):
+            ranked['total'] = len(ranked['items'])  # the estimate overcounted; nothing more to show
+            break
+        ranked = wider
+        search_cache.set(ck, ranked, ttl=5 if ranked['degraded'] else None)
+        register_search_terms(ck)
+        start = search_cursor_start(ranked['keys'], key) if key else (page - 1) * limit
     
-    total = len(results_list)
-    paginated = results_list[offset:offset + limit]
+    paginated = ranked['items'][start:start + limit]
+    end = start + len(paginated)
+    next_cursor = encode_search_cursor(ck, ranked['keys'][end - 1]) if paginated and end < len(ranked['items']) else None
     
-    logger.info(f"✅ Total: {total} | Page: {len(paginated)}")
+    total = ranked['total']
+    page = start // limit + 1
+    logger.info(f"🔎 '{query}' | Page: {page} | {len(paginated)} of {total}{' (cached)' if cached and cached[1] else ''}")
     
     return {
         'results': paginated,
+        'degraded': bool(ranked['degraded']),
+        'degraded_sources': ranked['degraded'],
+        'fuzzy': ranked['fuzzy'],
+        'next_cursor': next_cursor,
         'pagination': {
             'current_page': page,
             'total_pages': math.ceil(total / limit) if total > 0 else 1,
             'total_results': total,
             'per_page': limit,
-            'has_next': page < math.ceil(total / limit) if total > 0 else False,
-            'has_previous': page > 1
+            'has_next': next_cursor is not None,
+            'has_previous': start > 0,
+            'next_cursor': next_cursor
         }
     }
 
@@ -816,43 +2463,44 @@ async def get_home_movies_live():
     
     if movies:
         logger.info("🎨 FETCHING POSTERS FROM ALL SOURCES...")
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for movie in movies:
-                tasks.append(get_poster_guaranteed(movie['title'], session))
-            
-            posters = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            success_sources = {
-                'letterboxd': 0, 'imdb': 0, 'justwatch': 0, 
-                'impawards': 0, 'omdb': 0, 'tmdb': 0, 'custom': 0
-            }
-            
-            for i, (movie, poster_result) in enumerate(zip(movies, posters)):
-                if isinstance(poster_result, dict):
-                    movie['poster_url'] = poster_result['poster_url']
-                    movie['poster_source'] = poster_result['source']
-                    movie['poster_rating'] = poster_result.get('rating', '0.0')
-                    movie['has_poster'] = True
-                    source_key = poster_result['source'].lower()
-                    success_sources[source_key] += 1
-                else:
-                    # 100% FALLBACK GUARANTEE
-                    movie['poster_url'] = f"{Config.BACKEND_URL}/api/poster?title={urllib.parse.quote(movie['title'])}"
-                    movie['poster_source'] = 'CUSTOM'
-                    movie['poster_rating'] = '0.0'
-                    movie['has_poster'] = True
-                    success_sources['custom'] += 1
-            
-            # Log detailed success rates
-            logger.info(f"  📊 POSTER SOURCES SUMMARY:")
-            logger.info(f"     Letterboxd: {success_sources['letterboxd']}")
-            logger.info(f"     IMDb: {success_sources['imdb']}")
-            logger.info(f"     JustWatch: {success_sources['justwatch']}")
-            logger.info(f"     IMPAwards: {success_sources['impawards']}")
-            logger.info(f"     OMDB: {success_sources['omdb']}")
-            logger.info(f"     TMDB: {success_sources['tmdb']}")
-            logger.info(f"     Custom: {success_sources['custom']}")
+        # Built off the request path by home_feed_worker: wait for each lookup's own title
+        # budget instead of a request deadline, so the snapshot doesn't freeze placeholders
+        tasks = []
+        for movie in movies:
+            tasks.append(get_poster_guaranteed(movie['title']))
+        
+        posters = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        success_sources = {
+            'letterboxd': 0, 'imdb': 0, 'justwatch': 0, 
+            'impawards': 0, 'omdb': 0, 'tmdb': 0, 'custom': 0
+        }
+        
+        for i, (movie, poster_result) in enumerate(zip(movies, posters)):
+            if isinstance(poster_result, dict):
+                movie['poster_url'] = poster_result['poster_url']
+                movie['poster_source'] = poster_result['source']
+                movie['poster_rating'] = poster_result.get('rating', '0.0')
+                movie['has_poster'] = True
+                source_key = poster_result['source'].lower()
+                success_sources[source_key] += 1
+            else:
+                # 100% FALLBACK GUARANTEE
+                movie['poster_url'] = f"{Config.BACKEND_URL}/api/poster?title={urllib.parse.quote(movie['title'])}"
+                movie['poster_source'] = 'CUSTOM'
+                movie['poster_rating'] = '0.0'
+                movie['has_poster'] = True
+                success_sources['custom'] += 1
+        
+        # Log detailed success rates
+        logger.info(f"  📊 POSTER SOURCES SUMMARY:")
+        logger.info(f"     Letterboxd: {success_sources['letterboxd']}")
+        logger.info(f"     IMDb: {success_sources['imdb']}")
+        logger.info(f"     JustWatch: {success_sources['justwatch']}")
+        logger.info(f"     IMPAwards: {success_sources['impawards']}")
+        logger.info(f"     OMDB: {success_sources['omdb']}")
+        logger.info(f"     TMDB: {success_sources['tmdb']}")
+        logger.info(f"     Custom: {success_sources['custom']}")
         
         logger.info(f"  ✅ 100% POSTERS READY - ALL {len(movies)} MOVIES HAVE HIGH QUALITY POSTERS")
     
@@ -866,7 +2514,7 @@ async def root():
     return jsonify({
         'status': 'healthy',
         'service': 'SK4FiLM v6.0 - ALL SOURCES POSTERS',
-        'database': {'total_files': tf, 'live_mode': 'Posts LIVE, Files cached'},
+        'database': {'total_files': tf, 'total_posts': len(post_index['entries']), 'live_mode': 'Posts synced, Files cached'},
         'bot_status': 'online' if bot_started else 'starting',
         'features': {
             'poster_sources': 'Letterboxd → IMDb → JustWatch → IMPAwards → OMDB+TMDB',
@@ -874,7 +2522,14 @@ async def root():
             'smart_caching': 'ENABLED',
             'high_quality': 'GUARANTEED'
         },
-        'poster_stats': movie_db['stats']
+        'poster_stats': movie_db['stats'],
+        'source_health': {
+            name: {k: v for k, v in h.items() if k not in ('opened_at', 'probing')}
+            for name, h in source_health.items()
+        },
+        'api_keys': {'omdb': omdb_keys.status(), 'tmdb': tmdb_keys.status()},
+        'search_cache': {'entries': len(search_cache), **search_terms['stats']},
+        'fuzzy_index': {'titles': len(title_grams['titles']), 'grams': len(title_grams['postings']), 'files_loaded': title_grams['files_ready']}
     })
 
 @app.route('/health')
@@ -900,6 +2555,7 @@ async def api_index_status():
             'status': 'success',
             'total_indexed': total,
             'last_indexed': last_indexed,
+            'job': index_job_status(),
             'bot_status': 'online' if bot_started else 'starting',
             'features': 'ALL SOURCES POSTERS + 100% GUARANTEE'
         })
@@ -912,17 +2568,21 @@ async def api_movies():
         if not bot_started:
             return jsonify({'status': 'error', 'message': 'Starting...'}), 503
         
-        movies = await get_home_movies_live()
-        return jsonify({
-            'status': 'success', 
-            'movies': movies, 
-            'total': len(movies), 
-            'bot_username': Config.BOT_USERNAME, 
-            'mode': 'LIVE',
-            'poster_guarantee': '100% WORKING',
-            'poster_sources': 'Letterboxd → IMDb → JustWatch → IMPAwards → OMDB+TMDB',
-            'poster_stats': movie_db['stats']
-        })
+        if home_feed['ready'] is None:
+            return jsonify({'status': 'error', 'message': 'Starting...'}), 503
+        if home_feed['body'] is None:
+            try:
+                await asyncio.wait_for(home_feed['ready'].wait(), Config.POSTER_TITLE_BUDGET + 10)
+            except asyncio.TimeoutError:
+                return jsonify({'status': 'error', 'message': 'Home feed is still building'}), 503
+        
+        headers = {
+            'ETag': home_feed['etag'],
+            'Last-Modified': home_feed['last_modified']
+        }
+        if not_modified(home_feed['etag'], home_feed['last_modified']):
+            return Response(status=304, headers=headers)
+        return Response(home_feed['body'], mimetype='application/json', headers=headers)
     except Exception as e:
         logger.error(f"API /movies: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -933,22 +2593,34 @@ async def api_search():
         q = request.args.get('query', '').strip()
         p = int(request.args.get('page', 1))
         l = int(request.args.get('limit', 12))
+        c = request.args.get('cursor', '').strip() or None
         
         if not q:
             return jsonify({'status': 'error', 'message': 'Query required'}), 400
         if not bot_started:
             return jsonify({'status': 'error', 'message': 'Starting...'}), 503
         
-        result = await search_movies_live(q, l, p)
-        return jsonify({
+        try:
+            result = await search_movies_live(q, l, p, c)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Invalid cursor'}), 400
+        response = jsonify({
             'status': 'success', 
             'query': q, 
             'results': result['results'], 
             'pagination': result['pagination'], 
+            'next_cursor': result['next_cursor'],
+            'fuzzy': result['fuzzy'],
+            'degraded': result['degraded'],
+            'degraded_sources': result['degraded_sources'],
             'bot_username': Config.BOT_USERNAME, 
             'mode': 'LIVE',
             'features': 'ALL SOURCES POSTERS + 100% GUARANTEE'
         })
+        if result['degraded']:
+            # Partial results: don't let the CDN hold on to them
+            response.headers['Cache-Control'] = 'public, max-age=5'
+        return response
     except Exception as e:
         logger.error(f"API /search: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -973,18 +2645,34 @@ async def api_post():
         
         logger.info(f"📄 Fetching post: Channel {channel_id}, Message {message_id}")
         
-        try:
-            msg = await User.get_messages(channel_id, message_id)
-        except Exception as e:
-            logger.error(f"  ❌ Failed to fetch message: {e}")
-            return jsonify({'status':'error', 'message':'Failed to fetch message from Telegram'}), 404
-        
-        if not msg or not msg.text:
-            return jsonify({'status':'error', 'message':'Message not found or has no text content'}), 404
+        stored = None
+        if posts_col is not None:
+            try:
+                stored = await posts_col.find_one({'channel_id': channel_id, 'message_id': message_id})
+            except Exception as e:
+                logger.error(f"  ⚠️ Stored post error: {e}")
         
-        title = extract_title_smart(msg.text)
-        if not title:
-            title = msg.text.split('\n')[0][:60] if msg.text else "Movie Post"
+        if stored:
+            title = stored['title']
+            content = stored['content']
+            date = stored.get('date')
+            views = stored.get('views', 0)  # as of the last sync or edit of the post
+        else:
+            try:
+                msg = await User.get_messages(channel_id, message_id)
+            except Exception as e:
+                logger.error(f"  ❌ Failed to fetch message: {e}")
+                return jsonify({'status':'error', 'message':'Failed to fetch message from Telegram'}), 404
+            
+            if not msg or not msg.text:
+                return jsonify({'status':'error', 'message':'Message not found or has no text content'}), 404
+            
+            title = extract_title_smart(msg.text)
+            if not title:
+                title = msg.text.split('\n')[0][:60] if msg.text else "Movie Post"
+            content = format_post(msg.text)
+            date = msg.date
+            views = getattr(msg, 'views', 0)
         
         normalized_title = normalize_title(title)
         quality_options = {}
@@ -1007,15 +2695,15 @@ async def api_post():
         
         post_data = {
             'title': title,
-            'content': format_post(msg.text),
+            'content': content,
             'channel': channel_name(channel_id),
             'channel_id': channel_id,
             'message_id': message_id,
-            'date': msg.date.isoformat() if isinstance(msg.date, datetime) else str(msg.date),
-            'is_new': is_new(msg.date) if msg.date else False,
+            'date': date.isoformat() if isinstance(date, datetime) else str(date),
+            'is_new': is_new(date) if date else False,
             'has_file': has_file,
             'quality_options': quality_options,
-            'views': getattr(msg, 'views', 0)
+            'views': views
         }
         
         logger.info(f"  ✅ Post fetched: {title}")
@@ -1026,51 +2714,387 @@ async def api_post():
         logger.error(f"❌ API /post error: {e}")
         return jsonify({'status':'error', 'message': str(e)}), 500
 
+poster_disk = {
+    'lru': OrderedDict(),
+    'refs': {},
+    'sizes': {},
+    'variants': {},
+    'rendering': set(),
+    'pool': None,
+    'bytes': 0
+}
+
+def poster_disk_path(*parts):
+    return os.path.join(Config.POSTER_DISK_DIR, *parts)
+
+def poster_disk_register(key, meta):
+    """Track a cached URL; blobs are content-addressed and shared between URLs"""
+    blob = meta['blob']
+    poster_disk['lru'][key] = meta
+    poster_disk['lru'].move_to_end(key)
+    if blob not in poster_disk['refs']:
+        poster_disk['sizes'][blob] = meta['size']
+        poster_disk['bytes'] += meta['size']
+    poster_disk['refs'][blob] = poster_disk['refs'].get(blob, 0) + 1
+
+def poster_disk_evict():
+    """Drop least recently used URLs until the cache fits its size cap"""
+    cap = Config.POSTER_DISK_MB * 1024 * 1024
+    while poster_disk['bytes'] > cap and poster_disk['lru']:
+        key, meta = poster_disk['lru'].popitem(last=False)
+        blob = meta['blob']
+        try:
+            os.remove(poster_disk_path('urls', f"{key}.json"))
+        except OSError:
+            pass
+        poster_disk['refs'][blob] -= 1
+        if poster_disk['refs'][blob] <= 0:
+            del poster_disk['refs'][blob]
+            poster_disk['bytes'] -= poster_disk['sizes'].pop(blob, 0)
+            names = list(poster_disk['variants'].pop(blob, {})) + [f"{blob}.json"]
+            for path in [poster_disk_path('blobs', blob)] + [poster_disk_path('variants', n) for n in names]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+def load_poster_disk_cache():
+    """Rebuild the in-memory LRU from disk (oldest access first); runs in a thread"""
+    os.makedirs(poster_disk_path('urls'), exist_ok=True)
+    os.makedirs(poster_disk_path('blobs'), exist_ok=True)
+    os.makedirs(poster_disk_path('variants'), exist_ok=True)
+    entries = []
+    for name in os.listdir(poster_disk_path('urls')):
+        path = poster_disk_path('urls', name)
+        try:
+            with open(path) as f:
+                meta = json.load(f)
+            if os.path.exists(poster_disk_path('blobs', meta['blob'])):
+                entries.append((os.path.getmtime(path), name[:-5], meta))
+            else:
+                os.remove(path)
+        except (OSError, ValueError, KeyError):
+            continue
+    entries.sort(key=lambda e: e[0])
+    for _, key, meta in entries:
+        poster_disk_register(key, meta)
+    for name in os.listdir(poster_disk_path('blobs')):
+        if name not in poster_disk['refs']:
+            try:
+                os.remove(poster_disk_path('blobs', name))
+            except OSError:
+                pass
+    for blob in poster_disk['refs']:
+        try:
+            with open(poster_disk_path('variants', f"{blob}.json")) as f:
+                register_poster_variants(blob, json.load(f))
+        except (OSError, ValueError):
+            continue
+    poster_disk_evict()
+    return len(entries)
+
+def render_poster_variants(src, blob, out_dir, widths):
+    """Worker process: write resized WebP and JPEG variants of one poster"""
+    written = {}
+    with Image.open(src) as im:
+        im = im.convert('RGB')
+        for w in widths:
+            w = min(w, im.width)
+            h = max(1, round(im.height * w / im.width))
+            variant = im.resize((w, h), Image.LANCZOS)
+            for fmt, ext in (('WEBP', 'webp'), ('JPEG', 'jpg')):
+                name = f"{blob}_{w}.{ext}"
+                path = os.path.join(out_dir, name)
+                variant.save(path + '.tmp', fmt, quality=80)
+                os.replace(path + '.tmp', path)
+                written[name] = os.path.getsize(path)
+    with open(os.path.join(out_dir, f"{blob}.json"), 'w') as f:
+        json.dump(written, f)
+    return written
+
+def register_poster_variants(blob, variants):
+    added = sum(variants.values()) - sum(poster_disk['variants'].get(blob, {}).values())
+    poster_disk['variants'][blob] = variants
+    poster_disk['sizes'][blob] = poster_disk['sizes'].get(blob, 0) + added
+    poster_disk['bytes'] += added
+
+def get_variant_pool():
+    # spawn, not fork: the parent already runs motor monitor and to_thread worker threads
+    if poster_disk['pool'] is None:
+        poster_disk['pool'] = ProcessPoolExecutor(
+            max_workers=Config.POSTER_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return poster_disk['pool']
+
+def shutdown_variant_pool():
+    pool, poster_disk['pool'] = poster_disk['pool'], None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+def schedule_poster_variants(blob, content_type):
+    """Render size variants once per blob in the process pool, off the event loop"""
+    if Image is None or not content_type.startswith('image/') or 'svg' in content_type:
+        return
+    if blob in poster_disk['variants'] or blob in poster_disk['rendering']:
+        return
+    poster_disk['rendering'].add(blob)
+    
+    async def render():
+        pool = get_variant_pool()
+        try:
+            variants = await asyncio.get_running_loop().run_in_executor(
+                pool, render_poster_variants,
+                poster_disk_path('blobs', blob), blob, poster_disk_path('variants'), Config.POSTER_VARIANT_WIDTHS
+            )
+            if blob in poster_disk['refs']:
+                register_poster_variants(blob, variants)
+                poster_disk_evict()
+        except BrokenProcessPool:
+            # A worker died: replace the pool so later renders still run
+            logger.error("❌ Poster variant pool broke, restarting it")
+            if poster_disk['pool'] is pool:
+                shutdown_variant_pool()
+        except Exception as e:
+            logger.debug(f"Poster variant error: {e}")
+        finally:
+            poster_disk['rendering'].discard(blob)
+    
+    asyncio.create_task(render())
+
+def pick_poster_variant(blob, width):
+    """Smallest variant at least `width` wide (or the largest), WebP when accepted"""
+    variants = poster_disk['variants'].get(blob)
+    if not variants:
+        return None
+    ext = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpg'
+    widths = sorted({int(n.rsplit('_', 1)[1].split('.')[0]) for n in variants if n.endswith(ext)})
+    if not widths:
+        return None
+    w = next((x for x in widths if x >= width), widths[-1])
+    name = f"{blob}_{w}.{ext}"
+    return name, variants[name], 'image/webp' if ext == 'webp' else 'image/jpeg'
+
+def write_poster_meta(key, meta):
+    with open(poster_disk_path('urls', f"{key}.json"), 'w') as f:
+        json.dump(meta, f)
+
+def poster_host_allowed(host):
+    host = (host or '').lower()
+    if host in Config.POSTER_EXACT_HOSTS:
+        return True
+    return any(host == h or host.endswith('.' + h) for h in Config.POSTER_HOSTS)
+
+def poster_url_allowed(url):
+    try:
+        parsed = urllib.parse.urlparse(url)
+        return parsed.scheme in ('http', 'https') and poster_host_allowed(parsed.hostname)
+    except ValueError:
+        return False
+
+async def fetch_poster_upstream(url):
+    """GET an allow-listed poster, re-checking the allow-list on every redirect hop"""
+    timeout = aiohttp.ClientTimeout(total=None, connect=4, sock_read=10)
+    for _ in range(Config.POSTER_MAX_REDIRECTS + 1):
+        resp = await get_http_session().get(url, timeout=timeout, allow_redirects=False)
+        if resp.status not in (301, 302, 303, 307, 308):
+            return resp
+        location = resp.headers.get('Location', '')
+        resp.release()
+        url = urllib.parse.urljoin(url, location)
+        if not location or not poster_url_allowed(url):
+            logger.debug(f"Poster proxy redirect refused: {url}")
+            return None
+    return None
+
+def not_modified(etag, last_modified):
+    inm = request.headers.get('If-None-Match')
+    if inm:
+        # Weak comparison: a compressed representation carries W/ in front of the same tag
+        tag = etag[2:] if etag.startswith('W/') else etag
+        tags = [t.strip()[2:] if t.strip().startswith('W/') else t.strip() for t in inm.split(',')]
+        return tag in tags or inm.strip() == '*'
+    ims = request.headers.get('If-Modified-Since')
+    return bool(ims and last_modified and ims == last_modified)
+
+async def stream_poster_blob(path):
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, 65536)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+async def stream_and_store_poster(resp, key):
+    """Pass upstream bytes straight through while writing them to the disk cache"""
+    tmp = poster_disk_path('blobs', f".tmp-{os.urandom(8).hex()}")
+    digest = hashlib.sha256()
+    size = 0
+    storing = True
+    complete = False
+    f = await asyncio.to_thread(open, tmp, 'wb')
+    try:
+        async for chunk in resp.content.iter_chunked(65536):
+            size += len(chunk)
+            if storing and size > Config.POSTER_MAX_BYTES:
+                storing = False
+            if storing:
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+            yield chunk
+        complete = True
+    finally:
+        resp.release()
+        f.close()
+        if complete and storing and size and key not in poster_disk['lru']:
+            blob = digest.hexdigest()
+            meta = {
+                'blob': blob,
+                'size': size,
+                'content_type': resp.headers.get('Content-Type', 'image/jpeg').split(';')[0].strip().lower(),
+                'etag': f'"{blob[:32]}"',
+                'last_modified': resp.headers.get('Last-Modified') or formatdate(usegmt=True)
+            }
+            try:
+                await asyncio.to_thread(os.replace, tmp, poster_disk_path('blobs', blob))
+                await asyncio.to_thread(write_poster_meta, key, meta)
+                poster_disk_register(key, meta)
+                poster_disk_evict()
+                schedule_poster_variants(blob, meta['content_type'])
+            except OSError as e:
+                logger.debug(f"Poster store error: {e}")
+        else:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+async def proxy_poster(url, width=None):
+    """Caching image proxy for allow-listed poster hosts, with resized variants"""
+    try:
+        parsed = urllib.parse.urlparse(url)
+        parsed.port  # raises ValueError for a malformed netloc
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid poster URL'}), 400
+    
+    # Custom posters point back at this endpoint: render them directly
+    if parsed.netloc == urllib.parse.urlparse(Config.BACKEND_URL).netloc and parsed.path == '/api/poster':
+        q = urllib.parse.parse_qs(parsed.query)
+        return svg_poster_response(q.get('title', ['Movie'])[0], q.get('year', [''])[0])
+    
+    if not poster_url_allowed(url):
+        return jsonify({'status': 'error', 'message': 'Poster host not allowed'}), 403
+    
+    key = hashlib.sha256(url.encode()).hexdigest()
+    # Proxied bytes come from third parties: never let a browser run them on our origin
+    headers = {
+        'Cache-Control': 'public, max-age=604800',
+        'X-Content-Type-Options': 'nosniff',
+        'Content-Security-Policy': "default-src 'none'; sandbox"
+    }
+    
+    meta = poster_disk['lru'].get(key)
+    if meta and meta['content_type'].split(';')[0].strip().lower() in Config.POSTER_IMAGE_TYPES:
+        poster_disk['lru'].move_to_end(key)
+        variant = pick_poster_variant(meta['blob'], width) if width else None
+        if variant:
+            name, size, content_type = variant
+            etag = f'"{name[:32]}{name[64:]}"'
+            path = poster_disk_path('variants', name)
+            headers['Vary'] = 'Accept'
+        else:
+            if width:
+                schedule_poster_variants(meta['blob'], meta['content_type'])
+            etag, size, content_type = meta['etag'], meta['size'], meta['content_type']
+            path = poster_disk_path('blobs', meta['blob'])
+        headers.update({'ETag': etag, 'Last-Modified': meta['last_modified']})
+        if not_modified(etag, meta['last_modified']):
+            return Response('', status=304, headers=headers)
+        if os.path.exists(path):
+            headers['Content-Length'] = str(size)
+            return Response(stream_poster_blob(path), mimetype=content_type, headers=headers)
+    
+    try:
+        resp = await fetch_poster_upstream(url)
+    except Exception as e:
+        logger.debug(f"Poster proxy fetch error: {e}")
+        resp = None
+    
+    content_type = resp.headers.get('Content-Type', '').split(';')[0].strip().lower() if resp is not None else ''
+    if resp is None or resp.status != 200 or content_type not in Config.POSTER_IMAGE_TYPES:
+        if resp is not None:
+            resp.release()
+        return svg_poster_response('Movie', '', max_age=300)
+    
+    if resp.headers.get('Last-Modified'):
+        headers['Last-Modified'] = resp.headers['Last-Modified']
+    # aiohttp decodes gzip/br bodies, so the upstream length only holds for identity encoding
+    if resp.headers.get('Content-Length') and resp.headers.get('Content-Encoding', 'identity').lower() == 'identity':
+        headers['Content-Length'] = resp.headers['Content-Length']
+    return Response(stream_and_store_poster(resp, key), mimetype=content_type, headers=headers)
+
+POSTER_COLOR_SCHEMES = [
+    {'bg1': '#667eea', 'bg2': '#764ba2', 'text': '#ffffff'},
+    {'bg1': '#f093fb', 'bg2': '#f5576c', 'text': '#ffffff'},
+    {'bg1': '#4facfe', 'bg2': '#00f2fe', 'text': '#ffffff'},
+    {'bg1': '#43e97b', 'bg2': '#38f9d7', 'text': '#ffffff'},
+    {'bg1': '#fa709a', 'bg2': '#fee140', 'text': '#ffffff'},
+]
+
+@functools.lru_cache(maxsize=2048)
+def render_poster_svg(t, y):
+    """Render the custom poster -> (svg bytes, strong ETag); same output on every replica"""
+    d = t[:20] + "..." if len(t) > 20 else t
+    
+    # hash() is salted per process, so pick the scheme from a stable digest
+    digest = hashlib.md5(t.encode('utf-8')).digest()
+    scheme = POSTER_COLOR_SCHEMES[int.from_bytes(digest[:4], 'big') % len(POSTER_COLOR_SCHEMES)]
+    text_color = scheme['text']
+    bg1_color = scheme['bg1']
+    bg2_color = scheme['bg2']
+    
+    year_text = f'<text x="150" y="305" text-anchor="middle" fill="{text_color}" font-size="14" font-family="Arial">{html.escape(y)}</text>' if y else ''
+    
+    svg = f'''<svg width="300" height="450" xmlns="http://www.w3.org/2000/svg">
+        <defs>
+            <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
+                <stop offset="0%" style="stop-color:{bg1_color};stop-opacity:1"/>
+                <stop offset="100%" style="stop-color:{bg2_color};stop-opacity:1"/>
+            </linearGradient>
+        </defs>
+        <rect width="100%" height="100%" fill="url(#bg)"/>
+        <rect x="10" y="10" width="280" height="430" fill="none" stroke="{text_color}" stroke-width="2" stroke-opacity="0.3" rx="10"/>
+        <circle cx="150" cy="180" r="60" fill="rgba(255,255,255,0.1)"/>
+        <text x="150" y="185" text-anchor="middle" fill="{text_color}" font-size="60" font-family="Arial">🎬</text>
+        <text x="150" y="280" text-anchor="middle" fill="{text_color}" font-size="16" font-weight="bold" font-family="Arial">{html.escape(d)}</text>
+        {year_text}
+        <rect x="50" y="380" width="200" height="40" rx="20" fill="rgba(0,0,0,0.3)"/>
+        <text x="150" y="405" text-anchor="middle" fill="{text_color}" font-size="16" font-weight="bold" font-family="Arial">SK4FiLM</text>
+    </svg>'''.encode('utf-8')
+    return svg, f'"{hashlib.sha1(svg).hexdigest()}"'
+
+def svg_poster_response(t, y, max_age=86400):
+    svg, etag = render_poster_svg(t, y)
+    headers = {'Cache-Control': f'public, max-age={max_age}', 'ETag': etag}
+    if not_modified(etag, None):
+        return Response('', status=304, headers=headers)
+    return Response(svg, mimetype='image/svg+xml', headers=headers)
+
 @app.route('/api/poster')
 async def api_poster():
-    """100% WORKING CUSTOM POSTER GENERATOR"""
+    """Poster image proxy (?url=) + 100% WORKING CUSTOM POSTER GENERATOR (?title=)"""
+    url = request.args.get('url', '').strip()
+    if url:
+        width = request.args.get('w', '')
+        return await proxy_poster(url, int(width) if width.isdigit() else None)
+    
     try:
         t = request.args.get('title', 'Movie')
         y = request.args.get('year', '')
-        
-        d = t[:20] + "..." if len(t) > 20 else t
-        
-        color_schemes = [
-            {'bg1': '#667eea', 'bg2': '#764ba2', 'text': '#ffffff'},
-            {'bg1': '#f093fb', 'bg2': '#f5576c', 'text': '#ffffff'},
-            {'bg1': '#4facfe', 'bg2': '#00f2fe', 'text': '#ffffff'},
-            {'bg1': '#43e97b', 'bg2': '#38f9d7', 'text': '#ffffff'},
-            {'bg1': '#fa709a', 'bg2': '#fee140', 'text': '#ffffff'},
-        ]
-        
-        scheme = color_schemes[hash(t) % len(color_schemes)]
-        text_color = scheme['text']
-        bg1_color = scheme['bg1']
-        bg2_color = scheme['bg2']
-        
-        year_text = f'<text x="150" y="305" text-anchor="middle" fill="{text_color}" font-size="14" font-family="Arial">{html.escape(y)}</text>' if y else ''
-        
-        svg = f'''<svg width="300" height="450" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
-                    <stop offset="0%" style="stop-color:{bg1_color};stop-opacity:1"/>
-                    <stop offset="100%" style="stop-color:{bg2_color};stop-opacity:1"/>
-                </linearGradient>
-            </defs>
-            <rect width="100%" height="100%" fill="url(#bg)"/>
-            <rect x="10" y="10" width="280" height="430" fill="none" stroke="{text_color}" stroke-width="2" stroke-opacity="0.3" rx="10"/>
-            <circle cx="150" cy="180" r="60" fill="rgba(255,255,255,0.1)"/>
-            <text x="150" y="185" text-anchor="middle" fill="{text_color}" font-size="60" font-family="Arial">🎬</text>
-            <text x="150" y="280" text-anchor="middle" fill="{text_color}" font-size="16" font-weight="bold" font-family="Arial">{html.escape(d)}</text>
-            {year_text}
-            <rect x="50" y="380" width="200" height="40" rx="20" fill="rgba(0,0,0,0.3)"/>
-            <text x="150" y="405" text-anchor="middle" fill="{text_color}" font-size="16" font-weight="bold" font-family="Arial">SK4FiLM</text>
-        </svg>'''
-        
-        return Response(svg, mimetype='image/svg+xml', headers={
-            'Cache-Control': 'public, max-age=86400',
-            'Content-Type': 'image/svg+xml'
-        })
+        return svg_poster_response(t, y)
         
     except Exception as e:
         logger.error(f"Poster generation error: {e}")
@@ -1082,6 +3106,23 @@ async def api_poster():
 
 # ... (setup_bot, init, main functions remain the same as previous working version)
 
+def format_index_status():
+    st = index_job_status()
+    if st['status'] == 'idle':
+        return "🗂️ **Indexing:** Idle"
+    text = (
+        f"🗂️ **Indexing:** {st['status'].title()}{' (full)' if st['full'] else ''}\n"
+        f"• Files: {st['processed']} read, {st['written']} written, {st['errors']} errors\n"
+        f"• Speed: {st['files_per_sec']} files/s"
+    )
+    if st['progress_percent'] is not None:
+        text += f"\n• Progress: {st['progress_percent']}%"
+    if st['eta_seconds'] is not None:
+        text += f"\n• ETA: {st['eta_seconds'] // 60}m {st['eta_seconds'] % 60}s"
+    if st['error']:
+        text += f"\n• Error: `{st['error']}`"
+    return text
+
 async def setup_bot():
     @bot.on_message(filters.command("start") & filters.private)
     async def start_handler(client, message):
@@ -1225,18 +3266,58 @@ async def setup_bot():
     
     @bot.on_message(filters.command("index") & filters.user(Config.ADMIN_IDS))
     async def index_handler(client, message):
-        msg = await message.reply_text("🔄 **Starting background indexing...**")
-        asyncio.create_task(index_files_background())
-        await msg.edit_text("✅ **Indexing started in background!**\n\nCheck /stats for progress.")
+        action = message.command[1].lower() if len(message.command) > 1 else ''
+        
+        if action == 'cancel':
+            if cancel_index_job():
+                await message.reply_text("⏹️ **Indexing cancelled.**\n\nProgress is checkpointed; use `/index resume` to continue.")
+            else:
+                await message.reply_text("ℹ️ **No indexing job is running.**")
+            return
+        
+        if action == 'status':
+            await message.reply_text(format_index_status())
+            return
+        
+        full = action == 'full'
+        job, started = await start_index_job(full=full)
+        if not started and job is None:
+            await message.reply_text("⏳ **Indexing is running on another replica (or its lease could not be checked).**\n\nTry again once it finishes.")
+            return
+        if not started:
+            await message.reply_text(f"⏳ **Indexing already running!**\n\n{format_index_status()}")
+            return
+        
+        if action == 'resume':
+            await message.reply_text("▶️ **Indexing resumed from the last checkpoint!**\n\nCheck /stats for progress.")
+        elif full:
+            await message.reply_text("🔄 **Full rebuild started in background!**\n\nCheck /stats for progress.")
+        else:
+            await message.reply_text("✅ **Indexing started in background!**\n\nOnly new files are indexed; use `/index full` to rebuild.\nCheck /stats for progress.")
     
     @bot.on_message(filters.command("stats") & filters.user(Config.ADMIN_IDS))
     async def stats_handler(client, message):
         tf = await files_col.count_documents({}) if files_col is not None else 0
+        health_text = ''.join(
+            f"• {name}: {source_health[name]['state']} | "
+            f"{source_health[name]['successes']} hit, {source_health[name]['misses']} miss, {source_health[name]['failures']} fail | "
+            f"{source_health[name]['latency']:.1f}s\n"
+            for name, _ in sorted(POSTER_SOURCES, key=lambda src: expected_time_to_success(src[0]))
+        )
+        keys_text = ''.join(
+            f"• {pool.name} {k['key']}: {k['remaining']}"
+            f"{' (cooldown ' + str(k['cooldown_seconds']) + 's)' if k['cooldown_seconds'] else ''}\n"
+            for pool in (omdb_keys, tmdb_keys) for k in pool.status()
+        )
         
         stats_text = (
             f"📊 **SK4FiLM Statistics**\n\n"
             f"📁 **Files Indexed:** {tf}\n"
+            f"📥 **Live Ingested:** {live_ingest['written']} ({live_ingest['errors']} errors)\n"
+            f"{format_index_status()}\n"
             f"🔴 **Live Posts:** Active\n"
+            f"🔎 **Search Cache:** {len(search_cache)} queries, {search_terms['stats']['hits']} hits / {search_terms['stats']['misses']} misses, {search_terms['stats']['invalidated']} invalidated\n"
+            f"🏠 **Home Feed:** {home_feed['total']} movies, built {home_feed['built_at'].strftime('%H:%M:%S') if home_feed['built_at'] else 'never'}\n"
             f"🤖 **Bot Status:** Online\n\n"
             f"**🎨 Poster Sources (ALL WORKING):**\n"
             f"• Letterboxd: {movie_db['stats']['letterboxd']}\n"
@@ -1246,7 +3327,13 @@ async def setup_bot():
             f"• OMDB: {movie_db['stats']['omdb']}\n"
             f"• TMDB: {movie_db['stats']['tmdb']}\n" 
             f"• Custom: {movie_db['stats']['custom']}\n"
-            f"• Cache Hits: {movie_db['stats']['cache_hits']}\n\n"
+            f"• Cache Hits: {movie_db['stats']['cache_hits']}\n"
+            f"• Coalesced Lookups: {movie_db['stats']['coalesced']}\n"
+            f"• Prefetched: {poster_prefetch['resolved']} ({len(poster_prefetch['queued'])} queued)\n\n"
+            f"**🔌 Source Health (fastest first):**\n"
+            f"{health_text}\n"
+            f"**🔑 API Keys (remaining):**\n"
+            f"{keys_text}\n"
             f"**⚡ Features:**\n"
             f"• ✅ All sources working\n"
             f"• ✅ High quality posters\n"
@@ -1255,6 +3342,47 @@ async def setup_bot():
         )
         await message.reply_text(stats_text)
 
+async def setup_user():
+    live_queue = asyncio.Queue()
+    
+    @User.on_message(filters.chat(Config.TEXT_CHANNEL_IDS) & filters.text)
+    async def post_wake_handler(client, message):
+        if post_index['wake']:
+            post_index['wake'].set()
+    
+    # The watermark sync only pulls newer ids, so edits and deletions are applied here
+    @User.on_edited_message(filters.chat(Config.TEXT_CHANNEL_IDS))
+    async def post_edit_handler(client, message):
+        try:
+            await refresh_post(message.chat.id, message)
+            logger.info(f"✏️ Post updated: {channel_name(message.chat.id)} #{message.id}")
+        except Exception as e:
+            logger.error(f"❌ Post edit error: {e}")
+    
+    @User.on_deleted_messages(filters.chat(Config.TEXT_CHANNEL_IDS))
+    async def post_delete_handler(client, messages):
+        for message in messages:
+            try:
+                if message.chat:
+                    await remove_post(message.chat.id, message.id)
+            except Exception as e:
+                logger.error(f"❌ Post delete error: {e}")
+    
+    @User.on_message(filters.chat(Config.FILE_CHANNEL_ID) & (filters.document | filters.video))
+    async def file_ingest_handler(client, message):
+        doc = build_file_doc(message)
+        if doc:
+            live_ingest['received'] += 1
+            live_queue.put_nowait(doc)
+            logger.info(f"📥 New file queued: {doc['title']} ({doc['quality']})")
+    
+    if files_col is not None:
+        asyncio.create_task(file_write_worker(
+            live_queue, live_ingest,
+            flush_interval=Config.LIVE_FLUSH_INTERVAL,
+            stop_on_error=False
+        ))
+
 async def init():
     global User, bot, bot_started
     try:
@@ -1265,8 +3393,7 @@ async def init():
             "user_session", 
             api_id=Config.API_ID, 
             api_hash=Config.API_HASH, 
-            session_string=Config.USER_SESSION_STRING,
-            no_updates=True
+            session_string=Config.USER_SESSION_STRING
         )
         
         bot = Client(
@@ -1278,14 +3405,25 @@ async def init():
         
         await User.start()
         await bot.start()
+        await setup_user()
         await setup_bot()
         
         me = await bot.get_me()
         logger.info(f"✅ BOT STARTED: @{me.username}")
         bot_started = True
         
+        try:
+            cached = await asyncio.to_thread(load_poster_disk_cache)
+            logger.info(f"🖼️ Poster disk cache: {cached} images, {poster_disk['bytes'] // (1024 * 1024)} MB")
+        except Exception as e:
+            logger.error(f"❌ Poster disk cache: {e}")
+        
         logger.info("🔄 Starting background indexing...")
-        asyncio.create_task(index_files_background())
+        await start_index_job()
+        asyncio.create_task(posts_sync_worker())
+        asyncio.create_task(load_file_title_grams())
+        start_poster_prefetch()
+        start_home_feed()
         
         return True
     except Exception as e:
@@ -1310,7 +3448,11 @@ async def main():
     config.loglevel = "warning"
     
     logger.info(f"🌐 Web server starting on port {Config.WEB_SERVER_PORT}...")
-    await serve(app, config)
+    try:
+        await serve(app, config)
+    finally:
+        await close_http_session()
+        shutdown_variant_pool()
 
 if __name__ == "__main__":
     asyncio.run(main())